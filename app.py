@@ -1,12 +1,39 @@
-from flask import Flask, render_template, redirect, url_for, request, session, flash, send_file
+from flask import Flask, Request, render_template, redirect, url_for, request, session, flash, send_file, jsonify, abort, g
 from flask_sqlalchemy import SQLAlchemy
+import click
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from werkzeug.utils import secure_filename
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
+from datetime import datetime, timedelta
+from functools import lru_cache
+import base64
+import mimetypes
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
 import os
+import posixpath
+import shutil
+import signal
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, quote
+from zoneinfo import ZoneInfo
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
+import migrations
+from utils.cache import ReadThroughCache
+from utils.compression import compress_response
+from utils.database import database_uri, engine_options, configure_engine, env_int
+from utils.metrics import Metrics
+from utils.ratelimit import RateLimiter, backend_from_url
+from utils import history, search
+from utils.storage import save_blob, delete_blob, file_sha256, blob_name, HashingUpload, UploadTooLarge
 
 
 
@@ -14,18 +41,116 @@ from reportlab.lib.units import cm
 # ==================================================
 # APP CONFIG
 # ==================================================
+# `python app.py` runs this file as __main__. Register it as "app" too,
+# so the lazy `from app import ...` in utils/ gets this app and db
+# instead of importing a second copy with its own SQLAlchemy instance
+sys.modules.setdefault("app", sys.modules[__name__])
+
 app = Flask(__name__)
 app.secret_key = "dev-secret-key"
 
+# Behind Render/Heroku/nginx: how many proxies to trust for the client IP.
+# Without it remote_addr is the proxy, so every student would share one
+# "login-ip" rate-limit bucket. The Procfile sets 1 (Render/Heroku run one
+# router in front); set it to your proxy count for any other proxied setup.
+if env_int("TRUSTED_PROXIES", 0):
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=env_int("TRUSTED_PROXIES", 0))
+
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(BASE_DIR, "database.db")
+app.config["SQLALCHEMY_DATABASE_URI"] = database_uri(
+    "sqlite:///" + os.path.join(BASE_DIR, "database.db")
+)
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+    app.config["SQLALCHEMY_DATABASE_URI"]
+)
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
-UPLOAD_FOLDER = os.path.join(BASE_DIR, "static", "uploads")
+app.config["PROJECTS_PER_PAGE"] = 50
+app.config["SEARCH_RESULTS_PER_PAGE"] = 20
+# Deepest search page served (keeps OFFSET well inside SQLite's integers)
+app.config["SEARCH_MAX_PAGE"] = 500
+app.config["BULK_REVIEW_MAX"] = 5000
+app.config["USER_CACHE_TTL"] = 60
+# Token buckets: (burst capacity, tokens refilled per second).
+# "memory" keeps them per worker; set a redis:// URL to share them.
+app.config["RATELIMIT_STORAGE_URL"] = os.environ.get("RATELIMIT_STORAGE_URL", "memory")
+app.config["RATELIMITS"] = {
+    "login-ip": (20, 1 / 3),
+    "login-account": (5, 1 / 60),
+}
+app.config["STATS_CACHE_TTL"] = 30
+# Timestamps are stored in UTC; deadlines are entered and shown in this zone
+app.config["APP_TIMEZONE"] = os.environ.get("APP_TIMEZONE", "Africa/Accra")
+app.config["DEADLINE_CACHE_TTL"] = 30
+app.config["REPORT_BATCH_SIZE"] = 1000
+# Worker processes for one report render (1 = draw in-process).
+# Parallel rendering only kicks in above REPORT_PARALLEL_MIN_ROWS.
+app.config["REPORT_PROCESSES"] = 1
+app.config["REPORT_PARALLEL_MIN_ROWS"] = 20000
+app.config["REPORT_PAGES_PER_CHUNK"] = 200
+# Pool size for batch cover sheets (None = one per CPU)
+app.config["COVER_SHEET_PROCESSES"] = None
+# Seconds between queue polls, and how long a job may stay "running"
+# before it is assumed lost (worker killed) and queued again
+app.config["REPORT_WORKER_POLL"] = 1.0
+app.config["REPORT_JOB_TIMEOUT"] = 30 * 60
+# Seconds a stopping worker waits for its children to requeue their jobs
+app.config["REPORT_WORKER_STOP_TIMEOUT"] = 10
+
+# Outside the static folder: uploads are only reachable through
+# project_file, which checks who is asking
+UPLOAD_FOLDER = os.environ.get("UPLOAD_FOLDER", os.path.join(BASE_DIR, "uploads"))
+# Where uploads used to live; `flask --app app move-uploads` empties it
+LEGACY_UPLOAD_FOLDER = os.path.join(BASE_DIR, "static", "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
+# Generated PDF reports, one file per data version
+REPORT_FOLDER = os.path.join(BASE_DIR, "reports")
+os.makedirs(REPORT_FOLDER, exist_ok=True)
+app.config["REPORT_FOLDER"] = REPORT_FOLDER
+
+# How project files reach the client:
+#   "flask"            stream from this process (Range/ETag handled here)
+#   "x-sendfile"       Apache/lighttpd: send an X-Sendfile header
+#   "x-accel-redirect" nginx: redirect internally to X_ACCEL_PREFIX, which
+#                      must be an `internal` location aliased to UPLOAD_FOLDER
+app.config["FILE_SERVING"] = os.environ.get("FILE_SERVING", "flask")
+app.config["X_ACCEL_PREFIX"] = os.environ.get("X_ACCEL_PREFIX", "/protected-uploads/")
+app.config["USE_X_SENDFILE"] = app.config["FILE_SERVING"] == "x-sendfile"
+
+# SQL statements at least this slow (ms) go to the "slow_query" log,
+# appended to SLOW_QUERY_LOG when set (otherwise stderr); 0 turns it off
+app.config["SLOW_QUERY_MS"] = float(os.environ.get("SLOW_QUERY_MS", 100))
+app.config["SLOW_QUERY_LOG"] = os.environ.get("SLOW_QUERY_LOG")
+# Directory where each gunicorn worker leaves its metrics for /metrics to
+# add up (unset = every worker reports only its own), and the bearer
+# token a Prometheus scraper sends (admins can always read /metrics)
+app.config["METRICS_DIR"] = os.environ.get("METRICS_DIR")
+app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+
+# Largest project file a student may upload (bytes)
+app.config["MAX_UPLOAD_SIZE"] = 500 * 1024 * 1024
+# Whole request body: the file plus the form fields around it.
+# Werkzeug rejects anything bigger from Content-Length before reading it.
+app.config["MAX_CONTENT_LENGTH"] = app.config["MAX_UPLOAD_SIZE"] + 1024 * 1024
+
 db = SQLAlchemy(app)
+metrics = Metrics()
+
+with app.app_context():
+    configure_engine(db.engine)
+    metrics.init_app(
+        app,
+        db.engine,
+        slow_query_ms=app.config["SLOW_QUERY_MS"],
+        shared_dir=app.config["METRICS_DIR"]
+    )
+
+if app.config["SLOW_QUERY_LOG"]:
+    slow_query_handler = logging.FileHandler(app.config["SLOW_QUERY_LOG"])
+    slow_query_handler.setFormatter(logging.Formatter("%(asctime)s %(process)d %(message)s"))
+    logging.getLogger("slow_query").addHandler(slow_query_handler)
 
 # ==================================================
 # MODELS
@@ -45,31 +170,153 @@ class User(db.Model):
 
     role = db.Column(db.String(20), default="student")
 
+    # Bumped by profile changes (incl. CSV imports), for report versioning
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    __table_args__ = (
+        db.Index("ix_user_role", "role"),
+        db.Index("ix_user_role_updated", "role", "updated_at"),
+    )
+
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
+    # Path inside UPLOAD_FOLDER (content-addressed, may be shared)
     file = db.Column(db.String(200))
+    # Name the student uploaded it as
+    file_name = db.Column(db.String(200))
 
     status = db.Column(db.String(20), default="pending")
     feedback = db.Column(db.Text)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
 
     student_id = db.Column(db.Integer, db.ForeignKey("user.id"))
     student = db.relationship("User", backref="projects")
 
+    # New indexes must also be added as a migration (see migrations.py)
+    __table_args__ = (
+        db.Index("ix_project_student_created", "student_id", "created_at"),
+        db.Index("ix_project_status_created", "status", "created_at"),
+        db.Index("ix_project_created_id", "created_at", "id"),
+        db.Index("ix_project_file", "file"),
+        db.Index("ix_project_updated", "updated_at"),
+    )
+
 
 class SubmissionDeadline(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    # UTC, like every other timestamp in the database
     deadline = db.Column(db.DateTime, nullable=False)
 
+    # Cohort the deadline applies to; NULL matches every programme/level
+    programme = db.Column(db.String(150))
+    level = db.Column(db.String(20))
+
+    __table_args__ = (
+        db.Index("ix_deadline_cohort", "programme", "level", unique=True),
+    )
+
+
+class ReportJob(db.Model):
+    """A queued PDF report render, picked up by `flask report-worker`."""
+    id = db.Column(db.Integer, primary_key=True)
+
+    kind = db.Column(db.String(20), nullable=False)
+    # JSON options for the job (e.g. cover sheet filters)
+    params = db.Column(db.Text)
+    # queued -> running -> done | failed
+    status = db.Column(db.String(20), nullable=False, default="queued")
+
+    path = db.Column(db.String(300))
+    etag = db.Column(db.String(40))
+    error = db.Column(db.Text)
+
+    requested_by = db.Column(db.Integer, db.ForeignKey("user.id"))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_report_job_status", "status", "id"),
+    )
+
+
+class SubmissionEvent(db.Model):
+    """
+    Append-only history of submissions and reviews (see utils/history.py).
+    No foreign key on project_id: the history outlives deleted projects.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+
+    project_id = db.Column(db.Integer, nullable=False)
+    student_id = db.Column(db.Integer)
+    # submitted | resubmitted | approved | rejected | deleted
+    kind = db.Column(db.String(20), nullable=False)
+    from_status = db.Column(db.String(20))
+    to_status = db.Column(db.String(20))
+
+    # The student's cohort when it happened
+    programme = db.Column(db.String(150))
+    department = db.Column(db.String(150))
+
+    # On reviews: seconds since the project was last (re)submitted
+    turnaround_seconds = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_submission_event_project", "project_id", "kind", "created_at"),
+        db.Index("ix_submission_event_created", "created_at"),
+    )
+
+
+class SubmissionRollup(db.Model):
+    """Per-day event counters for the whole system, each programme and each department."""
+    id = db.Column(db.Integer, primary_key=True)
+
+    # all | programme | department
+    scope = db.Column(db.String(20), nullable=False)
+    name = db.Column(db.String(150), nullable=False, default="")
+    day = db.Column(db.Date, nullable=False)
+
+    submitted = db.Column(db.Integer, nullable=False, default=0)
+    resubmitted = db.Column(db.Integer, nullable=False, default=0)
+    approved = db.Column(db.Integer, nullable=False, default=0)
+    rejected = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+
+    # Reviews with a known turnaround, and their total
+    reviewed = db.Column(db.Integer, nullable=False, default=0)
+    review_seconds = db.Column(db.Float, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_submission_rollup_day", "scope", "name", "day", unique=True),
+    )
+
 # ==================================================
 # INIT DATABASE
 # ==================================================
 
+@app.cli.command("db-upgrade")
+def db_upgrade():
+    """Apply pending schema migrations to the configured database."""
+    applied = migrations.upgrade(db)
+
+    for version, description in applied:
+        print(f"✅ Applied migration {version}: {description}")
+
+    if not applied:
+        print("✅ Database schema is up to date")
+
+
 def create_default_admin():
     admin_email = "StArbOi@sintimdev.org"
 
@@ -84,16 +331,27 @@ def create_default_admin():
         db.session.commit()
         print("✅ Permanent admin created")
 
-with app.app_context():
-    db.create_all()
-    create_default_admin()
 
-    if not SubmissionDeadline.query.first():
+def create_default_deadline():
+    if not SubmissionDeadline.query.filter_by(programme=None, level=None).first():
+        # Default deadline for every cohort (Accra time is UTC)
         db.session.add(
             SubmissionDeadline(deadline=datetime(2026, 2, 12, 23, 59))
         )
         db.session.commit()
 
+
+# Importing this module touches no database: schema and seed data are
+# applied by `flask --app app db-upgrade` and `flask --app app seed`
+# (the release step in the Procfile), not by every worker that boots.
+
+@app.cli.command("seed")
+def seed():
+    """Create the default admin and submission deadline if missing."""
+    create_default_admin()
+    create_default_deadline()
+    print("✅ Seed data is in place")
+
 #def generate_gctu_cover_pdf(filename="gctu_report.pdf"):
  ######################)
 
@@ -109,154 +367,949 @@ with app.app_context():
 # ==================================================
 # CLEAN PROFESSIONAL PDF REPORT ENGINE (RENDER SAFE)
 # ==================================================
+# Drawing lives in utils/reports.py and is imported on first use, so
+# web workers don't load reportlab until someone asks for a report.
+
+def stream_rows(statement):
+    """
+    Iterate a SELECT in REPORT_BATCH_SIZE chunks through a streaming
+    (server-side where supported) cursor, so only one batch of plain
+    rows is in memory at a time.
+    """
+    result = db.session.execute(
+        statement.execution_options(
+            stream_results=True,
+            yield_per=app.config["REPORT_BATCH_SIZE"]
+        )
+    )
+
+    try:
+        yield from result
+    finally:
+        result.close()
+
+
+# ==================================================
+# REGISTERED STUDENTS PDF
+# ==================================================
+
+def generate_students_report_pdf(filename="students_report.pdf", processes=None):
+    from utils.reports import generate_report_pdf
+
+    # An absolute filename is used as-is (os.path.join semantics)
+    file_path = os.path.join(BASE_DIR, filename)
+    return generate_report_pdf("students", file_path, processes)
+
+
+# ==================================================
+# SUBMITTED PROJECTS PDF
+# ==================================================
+
+def generate_projects_report_pdf(filename="projects_report.pdf", processes=None):
+    from utils.reports import generate_report_pdf
+
+    file_path = os.path.join(BASE_DIR, filename)
+    return generate_report_pdf("projects", file_path, processes)
 
-def draw_gctu_cover_page(c, subtitle):
+
+# ==================================================
+# REPORT CACHE
+# ==================================================
+# A report is only rebuilt when its data version changes. The version
+# is a cheap aggregate over indexed columns; its hash names the file and
+# doubles as the ETag, so unchanged data is served straight from disk
+# (or answered with 304).
+
+def students_data_version():
+    # updated_at catches in-place profile updates (e.g. a CSV re-import)
+    return db.session.execute(
+        db.select(db.func.count(), db.func.max(User.id), db.func.max(User.updated_at))
+        .where(User.role == "student")
+    ).one()
+
+
+def projects_data_version():
+    # updated_at catches status changes that leave count and max id alone;
+    # the report prints student names, so their updated_at counts too
+    return db.session.execute(
+        db.select(
+            db.func.count(Project.id),
+            db.func.max(Project.id),
+            db.func.max(Project.updated_at),
+            db.func.max(User.updated_at)
+        ).select_from(Project).outerjoin(User, Project.student_id == User.id)
+    ).one()
+
+
+REPORTS = {
+    "students": (
+        students_data_version,
+        generate_students_report_pdf,
+        "GCTU_Registered_Students_Report.pdf",
+    ),
+    "projects": (
+        projects_data_version,
+        generate_projects_report_pdf,
+        "GCTU_Submitted_Projects_Report.pdf",
+    ),
+}
+
+
+def report_location(kind):
+    """(path, etag) the current version of a report is cached under."""
+    data_version = REPORTS[kind][0]
+
+    stamp = "|".join(str(part) for part in data_version())
+    etag = hashlib.sha1(f"{kind}|{stamp}".encode()).hexdigest()[:20]
+
+    path = os.path.join(app.config["REPORT_FOLDER"], f"{kind}-{etag}.pdf")
+    return path, etag
+
+
+def cached_report(kind):
     """
-    Draws the GCTU logo + title on the SAME first page
-    and returns where table content should start.
+    Return (path, etag) for the current version of a report,
+    generating it first if this version hasn't been built yet.
     """
-    width, height = A4
+    generate = REPORTS[kind][1]
+    folder = app.config["REPORT_FOLDER"]
+
+    path, etag = report_location(kind)
+
+    if not os.path.exists(path):
+        # Unique temp name per render: concurrent workers never write
+        # into the same file, and the rename publishes it atomically.
+        temp_path = os.path.join(folder, f".{kind}-{uuid.uuid4().hex}.tmp")
+        try:
+            generate(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        remove_stale_reports(kind, keep=path)
+
+    return path, etag
+
+
+def remove_stale_reports(kind, keep):
+    folder = app.config["REPORT_FOLDER"]
+
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if name.startswith(f"{kind}-") and path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def send_report(kind, path=None, etag=None):
+    if path is None:
+        path, etag = cached_report(kind)
+
+    response = send_file(
+        path,
+        as_attachment=True,
+        download_name=REPORTS[kind][2],
+        etag=etag,
+        conditional=True,
+        max_age=0
+    )
+    # Admin-only data: browsers may keep it but must revalidate
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
 
-    # ✅ Render-safe absolute logo path
-    logo_path = os.path.join(app.root_path, "static", "images", "gctu_logo.png")
+# ==================================================
+# BACKGROUND REPORT JOBS
+# ==================================================
+# Web requests only enqueue a ReportJob row; `flask report-worker`
+# processes claim and render them, so no gunicorn worker is tied up
+# drawing PDFs.
 
-    # Draw logo if exists
-    if os.path.exists(logo_path):
-        c.drawImage(
-            logo_path,
-            width / 2 - 4 * cm,
-            height - 5.5 * cm,
-            width=8 * cm,
-            preserveAspectRatio=True,
-            mask="auto"
+def enqueue_report_job(kind, user_id=None, params=None):
+    """
+    Queue a report render. Reuses an unfinished job for the same report,
+    and completes immediately when the current version is already cached.
+    """
+    params = json.dumps(params, sort_keys=True) if params else None
+
+    job = (
+        ReportJob.query
+        .filter(
+            ReportJob.kind == kind,
+            ReportJob.params == params,
+            ReportJob.status.in_(["queued", "running"])
         )
+        .order_by(ReportJob.id.desc())
+        .first()
+    )
+    if job:
+        return job
+
+    job = ReportJob(kind=kind, params=params, requested_by=user_id)
+
+    if kind in REPORTS:
+        path, etag = report_location(kind)
+        if os.path.exists(path):
+            job.status = "done"
+            job.path, job.etag = path, etag
+            job.finished_at = datetime.utcnow()
 
-    # University name
-    c.setFont("Helvetica-Bold", 18)
-    c.drawCentredString(
-        width / 2,
-        height - 8.5 * cm,
-        "GHANA COMMUNICATION TECHNOLOGY UNIVERSITY"
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def claim_report_job():
+    """
+    Atomically move the oldest queued job to "running".
+    The status check in the UPDATE makes sure only one worker wins it.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config["REPORT_JOB_TIMEOUT"])
+
+    db.session.execute(
+        db.update(ReportJob)
+        .where(ReportJob.status == "running", ReportJob.started_at < cutoff)
+        .values(status="queued")
     )
+    db.session.commit()
+
+    while True:
+        job_id = db.session.execute(
+            db.select(ReportJob.id)
+            .where(ReportJob.status == "queued")
+            .order_by(ReportJob.id)
+            .limit(1)
+        ).scalar()
+
+        if job_id is None:
+            return None
+
+        claimed = db.session.execute(
+            db.update(ReportJob)
+            .where(ReportJob.id == job_id, ReportJob.status == "queued")
+            .values(status="running", started_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+
+        if claimed:
+            return db.session.get(ReportJob, job_id)
+
+
+def run_report_job(job):
+    try:
+        if job.kind == "cover_sheets":
+            job.path = build_cover_sheets(job)
+        elif job.kind == "student_import":
+            job.path = run_student_import(job)
+        else:
+            job.path, job.etag = cached_report(job.kind)
+        job.status = "done"
+    except Exception as error:
+        db.session.rollback()
+        job.status = "failed"
+        job.error = str(error)
+
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
 
-    # System name
-    c.setFont("Helvetica-Bold", 14)
-    c.drawCentredString(
-        width / 2,
-        height - 10 * cm,
-        "PROJECT SUBMISSION SYSTEM"
+def build_cover_sheets(job):
+    from utils.pdf_generator import generate_cover_sheets
+
+    params = json.loads(job.params or "{}")
+    output_format = params.pop("format", "zip")
+
+    path = os.path.join(
+        app.config["REPORT_FOLDER"], f"cover-sheets-{job.id}.{output_format}"
     )
+    generate_cover_sheets(
+        path,
+        output_format,
+        processes=app.config["COVER_SHEET_PROCESSES"],
+        **params
+    )
+    return path
+
 
-    # Report subtitle
-    c.setFont("Helvetica", 12)
-    c.drawCentredString(width / 2, height - 11.5 * cm, subtitle)
+def run_student_import(job):
+    """Import an uploaded CSV; the job's file is the per-row result report."""
+    from utils.student_import import import_students
 
-    # Generated date
-    c.setFont("Helvetica", 10)
-    c.drawCentredString(
-        width / 2,
-        2.5 * cm,
-        f"Generated on {datetime.now().strftime('%d %B %Y, %I:%M %p')}"
+    params = json.loads(job.params)
+    path = os.path.join(app.config["REPORT_FOLDER"], f"student-import-{job.id}.csv")
+
+    try:
+        with open(path, "w", newline="") as out:
+            report = csv.writer(out)
+            report.writerow(["line", "email", "error"])
+
+            with open(params["path"], newline="", encoding="utf-8-sig") as lines:
+                summary = import_students(
+                    lines, on_error=lambda *row: report.writerow(row)
+                )
+
+            report.writerow([])
+            for key, value in summary.items():
+                report.writerow([key, value])
+    except Exception:
+        # A failed job has no result file to offer
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    finally:
+        # Batches committed before a failure still changed users
+        user_cache.invalidate()
+        dashboard_stats.invalidate()
+        if os.path.exists(params["path"]):
+            os.remove(params["path"])
+
+    return path
+
+
+def requeue_report_job(job_id):
+    """Hand a job this worker was running back to the queue."""
+    db.session.rollback()
+    db.session.execute(
+        db.update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == "running")
+        .values(status="queued", started_at=None)
     )
+    db.session.commit()
 
-    # ✅ Return starting Y for table content
-    return height - 13 * cm
+
+def report_worker_loop():
+    # A platform stop (SIGTERM) ends this process like Ctrl+C does;
+    # the job in flight goes back to the queue instead of waiting out
+    # REPORT_JOB_TIMEOUT as "running"
+    worker_pid = os.getpid()
+
+    def stop(signum, frame):
+        if os.getpid() != worker_pid:
+            # A render pool process forked by the job inherits this
+            # handler: it just dies, which fails the pool and lets the
+            # job process unwind instead of waiting on it
+            os._exit(0)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+
+    with app.app_context():
+        while True:
+            job = claim_report_job()
+
+            if job is None:
+                time.sleep(app.config["REPORT_WORKER_POLL"])
+                continue
+
+            print(f"▶ Report job {job.id} ({job.kind})")
+            try:
+                run_report_job(job)
+            except (KeyboardInterrupt, SystemExit):
+                requeue_report_job(job.id)
+                print(f"↩ Report job {job.id} requeued")
+                raise
+            print(f"✅ Report job {job.id} {job.status}")
+
+
+@app.cli.command("report-worker")
+@click.option("--workers", default=2, show_default=True, help="Worker processes.")
+def report_worker(workers):
+    """Process queued PDF report jobs until interrupted."""
+    processes = [
+        multiprocessing.Process(target=report_worker_loop)
+        for _ in range(workers)
+    ]
+
+    for process in processes:
+        process.start()
+
+    # Installed after the fork so the children keep their own handler
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        for process in processes:
+            process.join()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        # Stop the children (they requeue their jobs) and wait for them,
+        # so a second SIGTERM can't interrupt the shutdown itself
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(app.config["REPORT_WORKER_STOP_TIMEOUT"])
+            if process.is_alive():
+                process.kill()
+
+
+def report_job_json(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": url_for("report_job_status", job_id=job.id),
+        "download_url": (
+            url_for("report_job_download", job_id=job.id)
+            if job.status == "done" else None
+        ),
+    }
 
 
 # ==================================================
-# REGISTERED STUDENTS PDF
+# KEYSET PAGINATION
 # ==================================================
 
-def generate_students_report_pdf(filename="students_report.pdf"):
-    file_path = os.path.join(BASE_DIR, filename)
-    c = canvas.Canvas(file_path, pagesize=A4)
-    width, height = A4
+def encode_cursor(project):
+    """
+    Opaque cursor for the last project on a page.
+    Encodes (created_at, id) so the next page resumes right after it.
+    """
+    raw = f"{project.created_at.isoformat()}|{project.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
 
-    students = User.query.filter_by(role="student").all()
-    total_students = len(students)
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, project_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(project_id)
+    except (ValueError, UnicodeError):
+        return None
 
-    # Draw first-page header
-    y = draw_gctu_cover_page(c, "REGISTERED STUDENTS REPORT")
 
-    row_height = 0.7 * cm
+def older_than(position):
+    """Keyset condition: projects after `position` in newest-first order."""
+    created_at, project_id = position
+    return db.or_(
+        Project.created_at < created_at,
+        db.and_(Project.created_at == created_at, Project.id < project_id)
+    )
 
-    # Table header
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(2 * cm, y, "NAME")
-    c.drawString(8 * cm, y, "PROGRAMME")
-    c.drawString(14 * cm, y, "LEVEL")
 
-    y -= row_height
-    c.setFont("Helvetica", 10)
+def paginate_projects(cursor=None, per_page=None):
+    """
+    Newest-first page of projects with the student joined in.
 
-    # Table rows
-    for s in students:
-        c.drawString(2 * cm, y, s.name)
-        c.drawString(8 * cm, y, s.programme or "-")
-        c.drawString(14 * cm, y, s.level or "-")
+    Sorted on (created_at, id) and filtered with a keyset condition
+    instead of OFFSET, so every page costs one query however deep it is.
+    Returns (projects, next_cursor).
+    """
+    per_page = per_page or app.config["PROJECTS_PER_PAGE"]
 
-        y -= row_height
+    query = Project.query.options(db.joinedload(Project.student)).order_by(
+        Project.created_at.desc(), Project.id.desc()
+    )
 
-        # New page if space finished
-        if y < 2.5 * cm:
-            c.showPage()
-            y = draw_gctu_cover_page(c, "REGISTERED STUDENTS REPORT")
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        query = query.filter(older_than(position))
 
-    # Total count at bottom
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(2 * cm, 2 * cm, f"Total Registered Students: {total_students}")
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(per_page + 1).all()
+    projects = rows[:per_page]
 
-    c.save()
-    return file_path
+    next_cursor = encode_cursor(projects[-1]) if len(rows) > per_page else None
+    return projects, next_cursor
 
 
 # ==================================================
-# SUBMITTED PROJECTS PDF
+# DASHBOARD STATS (ONE QUERY, CACHED)
 # ==================================================
 
-def generate_projects_report_pdf(filename="projects_report.pdf"):
-    file_path = os.path.join(BASE_DIR, filename)
-    c = canvas.Canvas(file_path, pagesize=A4)
-    width, height = A4
+def load_dashboard_stats():
+    """
+    Per-status project counts and per-role user counts
+    in a single round trip (two GROUP BYs glued with UNION ALL).
+    """
+    by_status = db.select(
+        db.literal("status").label("kind"),
+        Project.status.label("name"),
+        db.func.count().label("total")
+    ).group_by(Project.status)
+
+    by_role = db.select(
+        db.literal("role").label("kind"),
+        User.role.label("name"),
+        db.func.count().label("total")
+    ).group_by(User.role)
+
+    stats = {"status": {}, "role": {}}
+    for kind, name, total in db.session.execute(db.union_all(by_status, by_role)):
+        stats[kind][name] = total
+
+    return {
+        "total_students": stats["role"].get("student", 0),
+        "total_projects": sum(stats["status"].values()),
+        "approved_projects": stats["status"].get("approved", 0),
+        "pending_projects": stats["status"].get("pending", 0),
+        "rejected_projects": stats["status"].get("rejected", 0),
+    }
+
+
+dashboard_stats = ReadThroughCache(
+    load_dashboard_stats, ttl=app.config["STATS_CACHE_TTL"]
+)
+
+
+# ==================================================
+# SUBMISSION HISTORY
+# ==================================================
+# Write routes append an event per transition with history.record(),
+# in the same transaction as the change; the admin trends page and
+# /api/v1/trends read the daily rollups it maintains.
+
+def project_event(project, kind, from_status=None, student=None):
+    """History event for `project`; `student` (for the cohort) defaults to its owner."""
+    student = student or project.student
+    return history.event(
+        project.id,
+        project.student_id,
+        kind,
+        from_status=from_status,
+        to_status=None if kind == "deleted" else project.status,
+        programme=student.programme if student else None,
+        department=student.department if student else None,
+    )
+
+
+# ==================================================
+# UPLOADS
+# ==================================================
+
+class UploadRequest(Request):
+    """
+    Writes each uploaded file part straight into UPLOAD_FOLDER, hashing it
+    as it is parsed, so store_project_file() only renames it into place
+    instead of copying Werkzeug's spooled temp file a second time.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingUpload(app.config["UPLOAD_FOLDER"], app.config["MAX_UPLOAD_SIZE"])
+
+
+app.request_class = UploadRequest
+
+
+def release_connection():
+    """
+    End the current read transaction before a route reads an upload.
+
+    The request body is only pulled off the socket when request.form or
+    request.files is first touched; a student on a slow link would
+    otherwise keep a pooled connection checked out for the whole upload.
+    Loaded objects are expired and reload on next access.
+    """
+    db.session.commit()
+
+
+def store_project_file(project, file):
+    """
+    Stream an uploaded project file into the content-addressed store
+    under UPLOAD_FOLDER and point the project at it.
+    Raises UploadTooLarge past MAX_UPLOAD_SIZE.
+    """
+    name, sha256, size = save_blob(
+        file,
+        app.config["UPLOAD_FOLDER"],
+        max_size=app.config["MAX_UPLOAD_SIZE"]
+    )
+
+    project.file = name
+    project.file_name = secure_filename(file.filename)
+
+
+def release_project_file(filename):
+    """
+    Delete a stored file once no project references it any more.
+    Call AFTER the commit that dropped the reference.
+    """
+    if not filename:
+        return
+
+    if Project.query.filter_by(file=filename).count() == 0:
+        delete_blob(app.config["UPLOAD_FOLDER"], filename)
+
+
+def project_file_etag(project):
+    """Content hash from the content-addressed name (None for legacy files)."""
+    digest = os.path.splitext(os.path.basename(project.file))[0]
+    if len(digest) == 64 and "/" in project.file:
+        return digest
+    return None
+
+
+@app.before_request
+def block_public_uploads():
+    # Anything still left in static/uploads is only served through
+    # project_file. Normalise first: "css/../uploads/x" is that folder too.
+    if request.endpoint != "static":
+        return
+
+    filename = posixpath.normpath(request.view_args.get("filename", "").replace("\\", "/"))
+    if filename == "uploads" or filename.startswith("uploads/"):
+        abort(404)
+
+
+def move_legacy_uploads():
+    """
+    Move files from static/uploads into UPLOAD_FOLDER, keeping their
+    relative paths (project.file stays valid). Returns how many moved.
+    """
+    source = LEGACY_UPLOAD_FOLDER
+    target = app.config["UPLOAD_FOLDER"]
+    if not os.path.isdir(source) or os.path.abspath(source) == os.path.abspath(target):
+        return 0
+
+    moved = 0
+    for directory, _, files in os.walk(source, topdown=False):
+        for filename in files:
+            old_path = os.path.join(directory, filename)
+            new_path = os.path.join(target, os.path.relpath(old_path, source))
+
+            if os.path.exists(new_path):
+                continue
+
+            os.makedirs(os.path.dirname(new_path), exist_ok=True)
+            shutil.move(old_path, new_path)
+            moved += 1
+
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+    return moved
+
 
-    projects = Project.query.all()
-    total_projects = len(projects)
+@app.cli.command("move-uploads")
+def move_uploads():
+    """Move uploads out of the public static folder into UPLOAD_FOLDER."""
+    moved = move_legacy_uploads()
+    print(f"✅ Moved {moved} upload(s) to {app.config['UPLOAD_FOLDER']}")
 
-    # Draw first-page header
-    y = draw_gctu_cover_page(c, "SUBMITTED PROJECTS REPORT")
 
-    row_height = 0.7 * cm
+@app.cli.command("gc-uploads")
+@click.option("--dry-run", is_flag=True, help="Only list what would change.")
+def gc_uploads(dry_run):
+    """
+    Move legacy flat uploads into the content-addressed store
+    and delete files that no project references.
+    """
+    root = app.config["UPLOAD_FOLDER"]
+
+    # Legacy names ({user_id}_{filename}) can be shared by several
+    # projects: move each file once, then repoint every project using it
+    legacy_files = [
+        file for (file,) in
+        db.session.query(Project.file).filter(Project.file.isnot(None)).distinct()
+        if "/" not in file
+    ]
+
+    for legacy in legacy_files:
+        legacy_path = os.path.join(root, legacy)
+        if not os.path.exists(legacy_path):
+            continue
+
+        ext = os.path.splitext(legacy)[1]
+        name = blob_name(file_sha256(legacy_path), ext if ext[1:].isalnum() else "")
+        print(f"move   {legacy} -> {name}")
+
+        if dry_run:
+            continue
+
+        blob_path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.replace(legacy_path, blob_path)
+
+        db.session.execute(
+            db.update(Project)
+            .where(Project.file == legacy)
+            .values(file=name, file_name=legacy.split("_", 1)[-1])
+        )
+
+    if not dry_run:
+        db.session.commit()
+
+    referenced = {
+        row.file for row in db.session.query(Project.file).filter(Project.file.isnot(None))
+    }
+
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            name = os.path.relpath(os.path.join(directory, filename), root)
+            name = name.replace(os.sep, "/")
+
+            if name in referenced:
+                continue
+
+            if dry_run:
+                print(f"delete {name}")
+            elif delete_blob(root, name):
+                print(f"delete {name}")
+
+
+@app.cli.command("search-reindex")
+def search_reindex():
+    """Rebuild the full-text search index from scratch."""
+    search.rebuild(db.session)
+    db.session.commit()
+    print("✅ Search index rebuilt")
+
+
+@app.cli.command("history-rebuild")
+def history_rebuild():
+    """Recompute the submission rollups from the event log."""
+    history.rebuild(db.session)
+    db.session.commit()
+    print("✅ Submission rollups rebuilt")
+
+
+@app.cli.command("import-students")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--batch-size", default=500, show_default=True)
+@click.option("--processes", type=int, help="Hashing processes (default: one per CPU).")
+def import_students_command(csv_file, batch_size, processes):
+    """
+    Import students from CSV (name,email,password,level,programme,
+    department,session_type). Existing emails get their profile updated.
+    """
+    from utils.student_import import import_students
+
+    def report_error(line_number, email, message):
+        print(f"✖ line {line_number} ({email or 'no email'}): {message}")
+
+    summary = import_students(
+        csv_file,
+        batch_size=batch_size,
+        processes=processes,
+        on_error=report_error
+    )
+    dashboard_stats.invalidate()
+    user_cache.invalidate()
+
+    print(
+        f"✅ Imported {summary['imported']} of {summary['rows']} rows "
+        f"({summary['errors']} errors) in {summary['seconds']}s "
+        f"— {summary['rows_per_second']} rows/s"
+    )
+
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    flash("File is too large")
+    return redirect(url_for("student_dashboard"))
+
+
+# ==================================================
+# HTTP CACHING + COMPRESSION
+# ==================================================
+#
+# Static URLs carry a content fingerprint (?v=<sha256 prefix>), so they
+# can be cached for a year and marked immutable; a changed file gets a
+# new URL. Text responses are compressed (utils/compression.py).
+# Read-only pages send an ETag built from a cheap version query and
+# answer a matching If-None-Match with 304 before doing any real work.
+
+STATIC_MAX_AGE = 365 * 24 * 3600
 
-    # Table header
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(2 * cm, y, "STUDENT")
-    c.drawString(7 * cm, y, "PROJECT TITLE")
-    c.drawString(14 * cm, y, "STATUS")
 
-    y -= row_height
-    c.setFont("Helvetica", 10)
+# Bounded: it is also keyed by request paths (see cache_and_compress)
+@lru_cache(maxsize=1024)
+def static_fingerprint(filename):
+    try:
+        return file_sha256(os.path.join(app.static_folder, filename))[:12]
+    except OSError:
+        return None
 
-    # Table rows
-    for p in projects:
-        c.drawString(2 * cm, y, p.student.name)
-        c.drawString(7 * cm, y, p.title[:40])  # prevent overflow
-        c.drawString(14 * cm, y, p.status)
 
-        y -= row_height
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    # Fingerprints are cached per process, so leave them off while
+    # editing files under the debug server
+    if endpoint != "static" or app.debug or "filename" not in values:
+        return
+    if values["filename"].startswith("uploads/"):
+        return
 
-        # New page handling
-        if y < 2.5 * cm:
-            c.showPage()
-            y = draw_gctu_cover_page(c, "SUBMITTED PROJECTS REPORT")
+    version = static_fingerprint(values["filename"])
+    if version:
+        values.setdefault("v", version)
 
-    # Total count
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(2 * cm, 2 * cm, f"Total Submitted Projects: {total_projects}")
 
-    c.save()
-    return file_path
+@app.after_request
+def cache_and_compress(response):
+    if request.endpoint == "static":
+        version = request.args.get("v")
+        # Only existing files: a 404 for a made-up name must not fill the cache
+        if (
+            version
+            and response.status_code in (200, 304)
+            and version == static_fingerprint(request.view_args["filename"])
+        ):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+        return compress_response(response, request.accept_encodings, static=True)
 
+    # Submitted files go out byte for byte (ranges, X-Sendfile)
+    if request.endpoint == "project_file":
+        return response
 
+    return compress_response(response, request.accept_encodings)
+
+
+@lru_cache(maxsize=1)
+def templates_version():
+    """Content hash of the templates, so a deploy invalidates every page ETag."""
+    digest = hashlib.sha1()
+    template_dir = os.path.join(app.root_path, app.template_folder)
+
+    for root, dirs, files in sorted(os.walk(template_dir)):
+        dirs.sort()
+        for name in sorted(files):
+            with open(os.path.join(root, name), "rb") as f:
+                digest.update(name.encode() + f.read())
+
+    return digest.hexdigest()
+
+
+def page_etag(*parts):
+    return hashlib.sha1(
+        "|".join(str(part) for part in (templates_version(),) + parts).encode()
+    ).hexdigest()
+
+
+def student_projects_version(student_id):
+    """(count, last change) of a student's projects: one indexed aggregate."""
+    return db.session.query(
+        db.func.count(Project.id), db.func.max(Project.updated_at)
+    ).filter(Project.student_id == student_id).one()
+
+
+def not_modified(etag):
+    response = app.response_class(status=304)
+    return with_etag(response, etag)
+
+
+def with_etag(response, etag):
+    """Per-user pages: never shared, always revalidated."""
+    response = app.make_response(response)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+# ==================================================
+# CURRENT USER + LOGIN THROTTLING
+# ==================================================
+
+def load_user_snapshot(user_id):
+    """Read-only copy of a user's profile (never the password hash)."""
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+
+    return SimpleNamespace(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        level=user.level,
+        programme=user.programme,
+        department=user.department,
+        session_type=user.session_type,
+        role=user.role
+    )
+
+
+user_cache = ReadThroughCache(load_user_snapshot, ttl=app.config["USER_CACHE_TTL"])
+
+
+def current_user():
+    """
+    The logged-in user's profile: loaded at most once per request (g)
+    and shared across requests for USER_CACHE_TTL seconds.
+    """
+    if "current_user" not in g:
+        user_id = session.get("user_id")
+        g.current_user = user_cache.get(user_id) if user_id else None
+    return g.current_user
+
+
+limiter = RateLimiter(
+    backend_from_url(app.config["RATELIMIT_STORAGE_URL"]),
+    app.config["RATELIMITS"]
+)
+
+
+def throttled(*checks):
+    """
+    Take a token from each (limit name, identity) bucket in turn.
+    Returns seconds to wait if any is empty, otherwise None.
+    """
+    for name, identity in checks:
+        allowed, retry_after = limiter.hit(name, identity)
+        if not allowed:
+            return retry_after
+    return None
+
+
+# ==================================================
+# DEADLINES
+# ==================================================
+#
+# The whole deadline table is tiny, so it is cached in process as a dict
+# keyed by (programme, level) and a submission never queries it. The most
+# specific row wins: programme + level, then programme, then level, then
+# the default row (both NULL).
+
+APP_TIMEZONE = ZoneInfo(app.config["APP_TIMEZONE"])
+
+
+def to_utc(local):
+    """Naive APP_TIMEZONE datetime (e.g. from a form) -> naive UTC."""
+    return local.replace(tzinfo=APP_TIMEZONE).astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+
+
+def to_local(utc):
+    """Naive UTC datetime from the database -> naive APP_TIMEZONE."""
+    return utc.replace(tzinfo=ZoneInfo("UTC")).astimezone(APP_TIMEZONE).replace(tzinfo=None)
+
+
+def load_deadlines():
+    return {
+        (row.programme, row.level): row.deadline
+        for row in SubmissionDeadline.query
+    }
+
+
+deadline_cache = ReadThroughCache(load_deadlines, ttl=app.config["DEADLINE_CACHE_TTL"])
+
+
+def deadline_for(user):
+    """The deadline (UTC) that applies to `user`, or None if none is set."""
+    programme = (user.programme or None) if user else None
+    level = (user.level or None) if user else None
+
+    deadlines = deadline_cache.get()
+    for key in ((programme, level), (programme, None), (None, level), (None, None)):
+        if key in deadlines:
+            return deadlines[key]
+    return None
+
+
+def submissions_closed(user):
+    deadline = deadline_for(user)
+    return deadline is not None and datetime.utcnow() > deadline
 
 
 # ==================================================
@@ -270,6 +1323,17 @@ def index():
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
+        # Checked before the (deliberately slow) password hash runs
+        retry_after = throttled(
+            ("login-ip", request.remote_addr),
+            ("login-account", request.form["email"].strip().lower())
+        )
+        if retry_after:
+            flash(f"Too many login attempts. Try again in {retry_after} seconds.")
+            response = app.make_response((render_template("login.html"), 429))
+            response.headers["Retry-After"] = str(retry_after)
+            return response
+
         user = User.query.filter_by(email=request.form["email"]).first()
 
         if user and check_password_hash(user.password, request.form["password"]):
@@ -316,7 +1380,10 @@ def register():
         )
 
         db.session.add(user)
+        db.session.flush()
+        search.index_students(db.session, [user.id])
         db.session.commit()
+        dashboard_stats.invalidate()
 
         flash("Account created successfully. Please login.")
         return redirect(url_for("login"))
@@ -332,9 +1399,13 @@ def change_password():
     if "user_id" not in session:
         return redirect(url_for("login"))
 
-    user = User.query.get(session["user_id"])
-
     if request.method == "POST":
+        retry_after = throttled(("login-account", f"user:{session['user_id']}"))
+        if retry_after:
+            flash(f"Too many attempts. Try again in {retry_after} seconds.")
+            return redirect(url_for("change_password"))
+
+        user = db.session.get(User, session["user_id"])
 
         if not check_password_hash(user.password, request.form["old_password"]):
             flash("Old password incorrect")
@@ -363,44 +1434,114 @@ def change_password():
 # STUDENT
 # ==================================================
 
+@app.route("/projects/<int:project_id>/file")
+def project_file(project_id):
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+
+    project = Project.query.get_or_404(project_id)
+
+    # Admins see every file, students only their own
+    if session.get("role") != "admin" and project.student_id != session["user_id"]:
+        abort(404)
+
+    if not project.file:
+        abort(404)
+
+    path = os.path.join(app.config["UPLOAD_FOLDER"], project.file)
+    if not os.path.exists(path):
+        abort(404)
+
+    download_name = project.file_name or os.path.basename(project.file)
+    etag = project_file_etag(project)
+
+    if app.config["FILE_SERVING"] == "x-accel-redirect":
+        response = app.response_class(
+            mimetype=mimetypes.guess_type(download_name)[0] or "application/octet-stream"
+        )
+        response.headers["X-Accel-Redirect"] = app.config["X_ACCEL_PREFIX"] + project.file
+        response.headers["Content-Disposition"] = (
+            f"attachment; filename*=UTF-8''{quote(download_name)}"
+        )
+        if etag:
+            response.set_etag(etag)
+    else:
+        # Range, If-Range and If-None-Match are handled by send_file;
+        # with USE_X_SENDFILE it only emits the X-Sendfile header
+        response = send_file(
+            path,
+            as_attachment=True,
+            download_name=download_name,
+            etag=etag if etag else True,
+            conditional=True,
+            max_age=0
+        )
+
+    # Student-chosen bytes on our origin: always a download, never
+    # rendered (an uploaded .html/.svg must not run in an admin's session)
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["Content-Security-Policy"] = "sandbox"
+
+    # Per-user content; the same URL may point at a resubmitted file later
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+
+    return response.make_conditional(request)
+
+
 @app.route("/student/dashboard")
 def student_dashboard():
     if session.get("role") != "student":
         return redirect(url_for("login"))
 
-    projects = Project.query.filter_by(student_id=session["user_id"]).all()
-    return render_template("student/dashboard.html", projects=projects)
+    user_id = session["user_id"]
+
+    etag = page_etag(
+        "student_dashboard", user_id, session.get("name"),
+        *student_projects_version(user_id)
+    )
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    projects = Project.query.filter_by(student_id=user_id).all()
+    return with_etag(render_template("student/dashboard.html", projects=projects), etag)
 
 @app.route("/student/create_project", methods=["GET", "POST"])
 def create_project():
     if session.get("role") != "student":
         return redirect(url_for("login"))
 
-    deadline = SubmissionDeadline.query.first()
-
     if request.method == "POST":
 
         # ⛔ deadline check FIRST
-        if datetime.now() > deadline.deadline:
+        if submissions_closed(current_user()):
             flash("Submission deadline has passed")
             return redirect(url_for("student_dashboard"))
 
-        file = request.files.get("file")
-        filename = None
-
-        if file:
-            filename = f"{session['user_id']}_{file.filename}"
-            file.save(os.path.join(app.config["UPLOAD_FOLDER"], filename))
+        release_connection()
 
         project = Project(
             title=request.form["title"],
             description=request.form["description"],
-            file=filename,
             student_id=session["user_id"]
         )
 
+        file = request.files.get("file")
+        if file:
+            try:
+                store_project_file(project, file)
+            except UploadTooLarge:
+                flash("File is too large")
+                return redirect(url_for("create_project"))
+
         db.session.add(project)
+        db.session.flush()
+        search.index_projects(db.session, [project.id])
+        history.record(db.session, [
+            project_event(project, "submitted", student=current_user())
+        ])
         db.session.commit()
+        dashboard_stats.invalidate()
 
         flash("Project submitted successfully")
         return redirect(url_for("student_dashboard"))
@@ -412,8 +1553,7 @@ def student_profile():
     if session.get("role") != "student":
         return redirect(url_for("login"))
 
-    user = User.query.get(session["user_id"])
-    return render_template("student/profile.html", user=user)
+    return render_template("student/profile.html", user=current_user())
 
 @app.route("/student/delete_project/<int:project_id>")
 def delete_project(project_id):
@@ -422,13 +1562,17 @@ def delete_project(project_id):
     if project.student_id != session.get("user_id"):
         return redirect(url_for("student_dashboard"))
 
-    if project.file:
-        path = os.path.join(app.config["UPLOAD_FOLDER"], project.file)
-        if os.path.exists(path):
-            os.remove(path)
+    filename = project.file
 
+    search.remove_projects(db.session, [project.id])
+    history.record(db.session, [
+        project_event(project, "deleted", from_status=project.status, student=current_user())
+    ])
     db.session.delete(project)
     db.session.commit()
+    dashboard_stats.invalidate()
+
+    release_project_file(filename)
 
     flash("Project deleted")
     return redirect(url_for("student_dashboard"))
@@ -448,18 +1592,38 @@ def edit_project(project_id):
         return redirect(url_for("student_dashboard"))
 
     if request.method == "POST":
-        project.title = request.form["title"]
-        project.description = request.form["description"]
+        if submissions_closed(current_user()):
+            flash("Submission deadline has passed")
+            return redirect(url_for("student_dashboard"))
+
+        release_connection()
 
         file = request.files.get("file")
+        old_file = project.file
+
         if file:
-            filename = f"{session['user_id']}_{file.filename}"
-            file.save(os.path.join(app.config["UPLOAD_FOLDER"], filename))
-            project.file = filename
+            try:
+                store_project_file(project, file)
+            except UploadTooLarge:
+                flash("File is too large")
+                return redirect(url_for("edit_project", project_id=project.id))
+
+        project.title = request.form["title"]
+        project.description = request.form["description"]
 
+        previous_status = project.status
         project.status = "pending"
         project.feedback = None
+        db.session.flush()
+        search.index_projects(db.session, [project.id])
+        history.record(db.session, [
+            project_event(project, "resubmitted", from_status=previous_status, student=current_user())
+        ])
         db.session.commit()
+        dashboard_stats.invalidate()
+
+        if project.file != old_file:
+            release_project_file(old_file)
 
         flash("Project resubmitted successfully")
         return redirect(url_for("student_dashboard"))
@@ -476,21 +1640,16 @@ def admin_dashboard():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
 
-    total_students = User.query.filter_by(role="student").count()
-    total_projects = Project.query.count()
-    approved_projects = Project.query.filter_by(status="approved").count()
-    pending_projects = Project.query.filter_by(status="pending").count()
+    stats = dashboard_stats.get()
 
-    projects = Project.query.all()
+    projects, next_cursor = paginate_projects(request.args.get("cursor"))
 
     return render_template(
         "admin/dashboard.html",
         projects=projects,
-        total_students=total_students,
-        total_projects=total_projects,
-        approved_projects=approved_projects,
-        pending_projects=pending_projects,
-        page="dashboard"
+        next_cursor=next_cursor,
+        page="dashboard",
+        **stats
     )
 
 
@@ -500,16 +1659,65 @@ def admin_deadline():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
 
-    deadline = SubmissionDeadline.query.first()
-
     if request.method == "POST":
-        deadline.deadline = datetime.strptime(
-            request.form["deadline"], "%Y-%m-%dT%H:%M"
+        if request.form.get("action") == "delete":
+            deadline = db.session.get(SubmissionDeadline, request.form.get("id", type=int))
+
+            # The default deadline can be moved but not removed
+            if deadline and (deadline.programme or deadline.level):
+                db.session.delete(deadline)
+                db.session.commit()
+                flash("Deadline removed")
+        else:
+            programme = request.form.get("programme", "").strip() or None
+            level = request.form.get("level", "").strip() or None
+
+            try:
+                value = to_utc(datetime.strptime(request.form["deadline"], "%Y-%m-%dT%H:%M"))
+            except ValueError:
+                flash("Invalid date")
+                return redirect(url_for("admin_deadline"))
+
+            deadline = SubmissionDeadline.query.filter_by(programme=programme, level=level).first()
+            if deadline is None:
+                deadline = SubmissionDeadline(programme=programme, level=level)
+                db.session.add(deadline)
+
+            deadline.deadline = value
+            db.session.commit()
+            flash("Deadline updated")
+
+        deadline_cache.invalidate()
+        return redirect(url_for("admin_deadline"))
+
+    deadlines = [
+        {
+            "id": row.id,
+            "programme": row.programme,
+            "level": row.level,
+            "deadline": to_local(row.deadline),
+        }
+        for row in SubmissionDeadline.query.order_by(
+            SubmissionDeadline.programme.isnot(None),
+            SubmissionDeadline.programme,
+            SubmissionDeadline.level
         )
-        db.session.commit()
-        flash("Deadline updated")
+    ]
+    # None until `flask seed` (or the form below) creates the default row
+    default = next((d for d in deadlines if not d["programme"] and not d["level"]), None)
 
-    return render_template("admin/deadline.html", deadline=deadline)
+    students = db.session.query(User.programme, User.level).filter(User.role == "student").distinct()
+    programmes = sorted({programme for programme, level in students if programme})
+    levels = sorted({level for programme, level in students if level})
+
+    return render_template(
+        "admin/deadline.html",
+        deadline=default,
+        deadlines=[d for d in deadlines if d is not default],
+        programmes=programmes,
+        levels=levels,
+        timezone=app.config["APP_TIMEZONE"]
+    )
 
 @app.route("/admin/view_project/<int:project_id>", methods=["GET", "POST"])
 def view_project(project_id):
@@ -519,21 +1727,254 @@ def view_project(project_id):
     project = Project.query.get_or_404(project_id)
 
     if request.method == "POST":
+        if request.form.get("action") not in REVIEW_ACTIONS:
+            flash("Choose approve or reject")
+            return redirect(url_for("view_project", project_id=project.id))
+
+        previous_status = project.status
         project.status = request.form.get("action")
         project.feedback = request.form.get("feedback")
+        db.session.flush()
+        search.index_projects(db.session, [project.id])
+        history.record(db.session, [
+            project_event(project, project.status, from_status=previous_status)
+        ])
         db.session.commit()
+        dashboard_stats.invalidate()
 
         flash("Decision saved successfully")
         return redirect(url_for("admin_dashboard"))
 
-    return render_template("admin/view_project.html", project=project)
+    return render_template(
+        "admin/view_project.html",
+        project=project,
+        events=history.project_history(db.session, project.id)
+    )
+
+
+REVIEW_ACTIONS = ("approved", "rejected")
+
+
+@app.route("/admin/projects/review", methods=["POST"])
+def bulk_review_projects():
+    """
+    Review many projects in one transaction.
+
+    Body: {"reviews": [{"id": 1, "action": "approved", "feedback": "..."}, ...]}
+      or: {"ids": [1, 2, 3], "action": "rejected", "feedback": "..."}
+    Returns a result per id: updated | not_found | invalid_action.
+    """
+    if session.get("role") != "admin":
+        return jsonify({"error": "Admin login required"}), 403
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Body must be a JSON object"}), 400
+
+    if "reviews" in payload:
+        reviews = payload["reviews"]
+    elif isinstance(payload.get("ids"), list):
+        reviews = [
+            {"id": project_id, "action": payload.get("action"), "feedback": payload.get("feedback")}
+            for project_id in payload["ids"]
+        ]
+    else:
+        reviews = None
+
+    if not isinstance(reviews, list) or not reviews:
+        return jsonify({"error": "No reviews given"}), 400
+
+    if not all(isinstance(review, dict) for review in reviews):
+        return jsonify({"error": "Every review must be an object"}), 400
+
+    if len(reviews) > app.config["BULK_REVIEW_MAX"]:
+        return jsonify({"error": f"At most {app.config['BULK_REVIEW_MAX']} reviews per request"}), 400
+
+    results = {}
+    wanted = {}
+
+    for review in reviews:
+        try:
+            project_id = int(review["id"])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": "Every review needs a numeric id"}), 400
+
+        # SQLite integers are 64-bit; anything bigger can't be a project
+        if not 0 < project_id < 2 ** 63:
+            return jsonify({"error": f"Project id out of range: {review['id']}"}), 400
+
+        if not isinstance(review.get("feedback"), (str, type(None))):
+            return jsonify({"error": "feedback must be a string"}), 400
+
+        if review.get("action") not in REVIEW_ACTIONS:
+            results[project_id] = "invalid_action"
+            # Last entry wins: an invalid one cancels an earlier valid one
+            wanted.pop(project_id, None)
+            continue
+
+        # Last entry wins if an id is listed twice
+        wanted[project_id] = review
+
+    # Current status and cohort, for the history events
+    existing = {
+        row.id: row for row in
+        db.session.query(
+            Project.id, Project.status, Project.student_id, User.programme, User.department
+        ).outerjoin(User, Project.student_id == User.id).filter(Project.id.in_(wanted))
+    }
+
+    now = datetime.utcnow()
+    rows = []
+    events = []
+
+    for project_id, review in wanted.items():
+        if project_id not in existing:
+            results[project_id] = "not_found"
+            continue
+
+        rows.append({
+            "project_id": project_id,
+            "status": review["action"],
+            "feedback": review.get("feedback"),
+            "updated_at": now,
+        })
+
+        project = existing[project_id]
+        events.append(history.event(
+            project_id,
+            project.student_id,
+            review["action"],
+            from_status=project.status,
+            to_status=review["action"],
+            programme=project.programme,
+            department=project.department,
+            created_at=now,
+        ))
+        results[project_id] = "updated"
+
+    if rows:
+        # One executemany UPDATE for the whole batch
+        db.session.execute(
+            db.update(Project.__table__)
+            .where(Project.__table__.c.id == db.bindparam("project_id"))
+            .values(
+                status=db.bindparam("status"),
+                feedback=db.bindparam("feedback"),
+                updated_at=db.bindparam("updated_at")
+            ),
+            rows
+        )
+        search.index_projects(db.session, [row["project_id"] for row in rows])
+        history.record(db.session, events)
+
+    db.session.commit()
+    dashboard_stats.invalidate()
+
+    return jsonify({
+        "updated": len(rows),
+        "results": [
+            {"id": project_id, "result": result}
+            for project_id, result in results.items()
+        ],
+        "stats": dashboard_stats.get(),
+    })
+
+TREND_PERIODS = (7, 30, 90, 365)
+
+
+@app.route("/admin/trends")
+def admin_trends():
+    """Submission and review trends, read from the daily rollups."""
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    days = request.args.get("days", 30, type=int)
+    if days not in TREND_PERIODS:
+        days = 30
+
+    series = history.trend(db.session, days)
+    reviewed = sum(day["reviewed"] for day in series)
+    review_hours = sum(
+        day["avg_turnaround_hours"] * day["reviewed"]
+        for day in series if day["reviewed"]
+    )
+
+    return render_template(
+        "admin/trends.html",
+        days=days,
+        periods=TREND_PERIODS,
+        series=series,
+        peak=max([day["submitted"] + day["resubmitted"] for day in series] + [1]),
+        totals={kind: sum(day[kind] for day in series) for kind in history.COUNTED_KINDS},
+        avg_turnaround_hours=round(review_hours / reviewed, 1) if reviewed else None,
+        programmes=history.breakdown(db.session, "programme", days),
+        departments=history.breakdown(db.session, "department", days),
+        page="trends"
+    )
+
+
+@app.route("/admin/students/import", methods=["GET", "POST"])
+def admin_import_students():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    if request.method == "POST":
+        file = request.files.get("file")
+        if not file:
+            flash("Choose a CSV file to import")
+            return redirect(url_for("admin_import_students"))
+
+        folder = os.path.join(app.config["REPORT_FOLDER"], "imports")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{uuid.uuid4().hex}.csv")
+        file.save(path)
+
+        job = enqueue_report_job("student_import", session.get("user_id"), {"path": path})
+        return redirect(url_for("report_job", job_id=job.id))
+
+    return render_template("admin/import_students.html", page="students")
+
+
+@app.route("/admin/search")
+def admin_search():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    query = request.args.get("q", "").strip()
+    page = min(max(request.args.get("page", 1, type=int), 1), app.config["SEARCH_MAX_PAGE"])
+    per_page = app.config["SEARCH_RESULTS_PER_PAGE"]
+    offset = (page - 1) * per_page
+
+    project_ids, more_projects = search.search_projects(db.session, query, per_page, offset)
+    student_ids, more_students = search.search_students(db.session, query, per_page, offset)
+
+    # Fetch the hits in one query each, then restore rank order
+    projects = {
+        p.id: p for p in
+        Project.query.options(db.joinedload(Project.student))
+        .filter(Project.id.in_(project_ids))
+    }
+    students = {u.id: u for u in User.query.filter(User.id.in_(student_ids))}
+
+    return render_template(
+        "admin/search.html",
+        query=query,
+        page_number=page,
+        projects=[projects[i] for i in project_ids if i in projects],
+        students=[students[i] for i in student_ids if i in students],
+        has_more=more_projects or more_students
+    )
+
 
 @app.route("/admin/students")
 def admin_students():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
 
-    students = User.query.filter_by(role="student").all()
+    # Only what the table shows (never the password hash)
+    students = User.query.options(
+        db.load_only(User.id, User.name, User.email, User.programme)
+    ).filter_by(role="student").all()
     return render_template(
         "admin/students.html",
         students=students,
@@ -545,12 +1986,7 @@ def download_projects_pdf():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
 
-    pdf_path = generate_projects_report_pdf()
-    return send_file(
-        pdf_path,
-        as_attachment=True,
-        download_name="GCTU_Submitted_Projects_Report.pdf"
-    )
+    return send_report("projects")
 
 
 @app.route("/admin/download-students-pdf")
@@ -558,12 +1994,7 @@ def download_students_pdf():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
 
-    pdf_path = generate_students_report_pdf()
-    return send_file(
-        pdf_path,
-        as_attachment=True,
-        download_name="GCTU_Registered_Students_Report.pdf"
-    )
+    return send_report("students")
 
 
 
@@ -592,13 +2023,23 @@ def admin_view_student(user_id):
         return redirect(url_for("login"))
 
     student = User.query.get_or_404(user_id)
+
+    etag = page_etag(
+        "admin_view_student", session.get("name"),
+        student.id, student.name, student.email, student.level,
+        student.programme, student.department, student.session_type,
+        *student_projects_version(user_id)
+    )
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
     projects = Project.query.filter_by(student_id=user_id).all()
 
-    return render_template(
+    return with_etag(render_template(
         "admin/view_student.html",
         student=student,
         projects=projects
-    )
+    ), etag)
 
 # ==========================
 # PDF DOWNLOADS (ADMIN)
@@ -609,13 +2050,7 @@ def download_projects_report():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
 
-    pdf_path = generate_projects_report_pdf()
-
-    return send_file(
-        pdf_path,
-        as_attachment=True,
-        download_name="GCTU_Submitted_Projects_Report.pdf"
-    )
+    return send_report("projects")
 
 
 @app.route("/admin/download-students-report")
@@ -623,21 +2058,456 @@ def download_students_report():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
 
-    pdf_path = generate_students_report_pdf()
+    return send_report("students")
 
-    return send_file(
-        pdf_path,
-        as_attachment=True,
-        download_name="GCTU_Registered_Students_Report.pdf"
+
+
+# ==========================
+# REPORT JOBS (ADMIN)
+# ==========================
+
+@app.route("/admin/reports/<kind>/jobs", methods=["POST"])
+def start_report_job(kind):
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    if kind not in REPORTS:
+        abort(404)
+
+    job = enqueue_report_job(kind, session.get("user_id"))
+
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(report_job_json(job)), 202
+
+    return redirect(url_for("report_job", job_id=job.id))
+
+
+@app.route("/admin/reports/jobs/<int:job_id>")
+def report_job(job_id):
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    job = ReportJob.query.get_or_404(job_id)
+    return render_template("admin/report_job.html", job=job)
+
+
+@app.route("/admin/reports/jobs/<int:job_id>/status")
+def report_job_status(job_id):
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    job = ReportJob.query.get_or_404(job_id)
+    return jsonify(report_job_json(job))
+
+
+@app.route("/admin/reports/jobs/<int:job_id>/download")
+def report_job_download(job_id):
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    job = ReportJob.query.get_or_404(job_id)
+
+    if job.status != "done":
+        return redirect(url_for("report_job", job_id=job.id))
+
+    if not os.path.exists(job.path):
+        flash("That report has been replaced by a newer version. Please generate it again.")
+        return redirect(url_for("admin_dashboard"))
+
+    if job.kind == "student_import":
+        return send_file(
+            job.path,
+            as_attachment=True,
+            download_name="GCTU_Student_Import_Report.csv"
+        )
+
+    if job.kind == "cover_sheets":
+        extension = os.path.splitext(job.path)[1]
+        return send_file(
+            job.path,
+            as_attachment=True,
+            download_name=f"GCTU_Cover_Sheets{extension}"
+        )
+
+    return send_report(job.kind, job.path, job.etag)
+
+
+@app.route("/admin/cover-sheets", methods=["GET", "POST"])
+def admin_cover_sheets():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    if request.method == "POST":
+        from utils.pdf_generator import COVER_SHEET_FILTERS
+
+        params = {
+            name: request.form[name]
+            for name in COVER_SHEET_FILTERS
+            if request.form.get(name)
+        }
+        params["format"] = "pdf" if request.form.get("format") == "pdf" else "zip"
+
+        job = enqueue_report_job("cover_sheets", session.get("user_id"), params)
+        return redirect(url_for("report_job", job_id=job.id))
+
+    def choices(column):
+        return [
+            value for (value,) in
+            db.session.query(column).filter(column.isnot(None)).distinct().order_by(column)
+        ]
+
+    return render_template(
+        "admin/cover_sheets.html",
+        programmes=choices(User.programme),
+        departments=choices(User.department),
+        levels=choices(User.level),
+        page="cover_sheets"
     )
 
 
+# ==================================================
+# JSON API (v1)
+# ==================================================
+#
+# Read-only resources for lighter clients and integrations:
+#
+#   GET  /api/v1/projects[/<id>]   ?fields=id,title,student_name&status=&cursor=&limit=
+#   GET  /api/v1/students[/<id>]   ?fields=id,name,email&programme=&level=&cursor=&limit=
+#   GET  /api/v1/stats
+#   GET  /api/v1/deadline
+#   GET  /api/v1/trends            ?days=30&scope=all|programme|department&name=
+#   POST /api/v1/batch             {"requests": [{"id": "a", "path": "/api/v1/stats"}, ...]}
+#
+# `fields` picks the columns to return and only those are selected (the
+# user join only happens when a student_* field is asked for). Lists are
+# keyset-paginated: pass back `next_cursor` as `cursor`. Uses the normal
+# login session; students only see their own projects and profile.
+
+API_PROJECT_FIELDS = {
+    "id": Project.id,
+    "title": Project.title,
+    "description": Project.description,
+    "status": Project.status,
+    "feedback": Project.feedback,
+    "file_name": Project.file_name,
+    "created_at": Project.created_at,
+    "updated_at": Project.updated_at,
+    "student_id": Project.student_id,
+    "student_name": User.name,
+    "student_email": User.email,
+    "programme": User.programme,
+}
+API_PROJECT_USER_FIELDS = {"student_name", "student_email", "programme"}
+API_PROJECT_DEFAULT = ("id", "title", "status", "student_id", "student_name", "created_at")
+
+API_STUDENT_FIELDS = {
+    "id": User.id,
+    "name": User.name,
+    "email": User.email,
+    "level": User.level,
+    "programme": User.programme,
+    "department": User.department,
+    "session_type": User.session_type,
+}
+API_STUDENT_DEFAULT = ("id", "name", "email", "programme", "level")
+
+API_MAX_PAGE_SIZE = 200
+API_MAX_BATCH = 20
+
+
+class ApiError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def api_user(admin=False):
+    if "user_id" not in session:
+        raise ApiError(401, "Login required")
+    if admin and session.get("role") != "admin":
+        raise ApiError(403, "Admin login required")
+    return session["user_id"]
+
+
+def api_fields(args, available, default):
+    """The requested columns, as {name: column}."""
+    names = [n.strip() for n in args.get("fields", "").split(",") if n.strip()] or list(default)
+
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        raise ApiError(400, f"Unknown field(s): {', '.join(unknown)}")
+
+    return {name: available[name].label(name) for name in dict.fromkeys(names)}
+
+
+def api_limit(args):
+    limit = args.get("limit", app.config["PROJECTS_PER_PAGE"], type=int)
+    return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+
+def api_row(row, names):
+    item = {}
+    for name in names:
+        value = row._mapping[name]
+        item[name] = value.isoformat() if isinstance(value, datetime) else value
+    return item
+
+
+def projects_statement(fields):
+    statement = db.select(*fields.values(), Project.id.label("_id"), Project.created_at.label("_created_at"))
+    if API_PROJECT_USER_FIELDS & fields.keys():
+        statement = statement.outerjoin(User, Project.student_id == User.id)
+    return statement
+
+
+def api_list_projects(args):
+    user_id = api_user()
+    fields = api_fields(args, API_PROJECT_FIELDS, API_PROJECT_DEFAULT)
+    limit = api_limit(args)
+
+    statement = projects_statement(fields).order_by(Project.created_at.desc(), Project.id.desc())
+
+    if session.get("role") != "admin":
+        statement = statement.where(Project.student_id == user_id)
+    elif args.get("student_id", type=int):
+        statement = statement.where(Project.student_id == args.get("student_id", type=int))
+
+    if args.get("status"):
+        statement = statement.where(Project.status == args["status"])
+
+    if args.get("cursor"):
+        position = decode_cursor(args["cursor"])
+        if position is None:
+            raise ApiError(400, "Invalid cursor")
+        statement = statement.where(older_than(position))
+
+    rows = db.session.execute(statement.limit(limit + 1)).all()
+    page = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(SimpleNamespace(created_at=last._created_at, id=last._id))
+
+    return {"data": [api_row(row, fields) for row in page], "next_cursor": next_cursor}
+
+
+def api_get_project(args, project_id):
+    user_id = api_user()
+    fields = api_fields(args, API_PROJECT_FIELDS, API_PROJECT_DEFAULT)
+
+    statement = projects_statement(fields).where(Project.id == project_id)
+    if session.get("role") != "admin":
+        statement = statement.where(Project.student_id == user_id)
+
+    row = db.session.execute(statement).first()
+    if row is None:
+        raise ApiError(404, "Project not found")
+
+    return {"data": api_row(row, fields)}
+
+
+def api_list_students(args):
+    api_user(admin=True)
+    fields = api_fields(args, API_STUDENT_FIELDS, API_STUDENT_DEFAULT)
+    limit = api_limit(args)
+
+    statement = db.select(*fields.values(), User.id.label("_id")).where(
+        User.role == "student"
+    ).order_by(User.id)
+
+    for name in ("programme", "level"):
+        if args.get(name):
+            statement = statement.where(API_STUDENT_FIELDS[name] == args[name])
+
+    if args.get("cursor"):
+        try:
+            after = int(base64.urlsafe_b64decode(args["cursor"].encode()).decode())
+        except (ValueError, UnicodeError):
+            raise ApiError(400, "Invalid cursor")
+        statement = statement.where(User.id > after)
+
+    rows = db.session.execute(statement.limit(limit + 1)).all()
+    page = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = base64.urlsafe_b64encode(str(page[-1]._id).encode()).decode()
+
+    return {"data": [api_row(row, fields) for row in page], "next_cursor": next_cursor}
+
+
+def api_get_student(args, user_id):
+    if api_user() != user_id and session.get("role") != "admin":
+        raise ApiError(404, "Student not found")
+    fields = api_fields(args, API_STUDENT_FIELDS, API_STUDENT_DEFAULT)
+
+    row = db.session.execute(
+        db.select(*fields.values()).where(User.id == user_id, User.role == "student")
+    ).first()
+    if row is None:
+        raise ApiError(404, "Student not found")
+
+    return {"data": api_row(row, fields)}
+
+
+def api_stats(args):
+    api_user(admin=True)
+    return {"data": dashboard_stats.get()}
+
+
+def api_trends(args):
+    api_user(admin=True)
+
+    days = max(1, min(args.get("days", 30, type=int), 366))
+    scope = args.get("scope", "all")
+    if scope not in ("all",) + history.SCOPES:
+        raise ApiError(400, "scope must be all, programme or department")
+    if scope != "all" and not args.get("name"):
+        raise ApiError(400, f"name is required for scope={scope}")
+
+    data = {"days": history.trend(db.session, days, scope, args.get("name", ""))}
+    if scope == "all":
+        data.update({
+            scope_name: history.breakdown(db.session, scope_name, days)
+            for scope_name in history.SCOPES
+        })
+    return {"data": data}
+
+
+def api_deadline(args):
+    api_user()
+
+    if session.get("role") != "admin":
+        deadline = deadline_for(current_user())
+        return {"data": {
+            "deadline": deadline.isoformat() if deadline else None,
+            "closed": submissions_closed(current_user()),
+            "timezone": "UTC",
+        }}
+
+    return {"data": [
+        {"programme": programme, "level": level, "deadline": deadline.isoformat()}
+        for (programme, level), deadline in sorted(
+            deadline_cache.get().items(), key=lambda item: (item[0][0] or "", item[0][1] or "")
+        )
+    ]}
+
+
+# endpoint -> resource function, for the routes and for /api/v1/batch
+API_RESOURCES = {
+    "api_projects": api_list_projects,
+    "api_project": api_get_project,
+    "api_students": api_list_students,
+    "api_student": api_get_student,
+    "api_stats_resource": api_stats,
+    "api_deadline_resource": api_deadline,
+    "api_trends_resource": api_trends,
+}
+
+
+def call_api(endpoint, args, view_args):
+    """Run a resource function; returns (body, status)."""
+    try:
+        return API_RESOURCES[endpoint](args, **view_args), 200
+    except ApiError as error:
+        return {"error": error.message}, error.status
+
+
+def api_response(**view_args):
+    body, status = call_api(request.endpoint, request.args, view_args)
+    return jsonify(body), status
+
+
+app.add_url_rule("/api/v1/projects", "api_projects", api_response)
+app.add_url_rule("/api/v1/projects/<int:project_id>", "api_project", api_response)
+app.add_url_rule("/api/v1/students", "api_students", api_response)
+app.add_url_rule("/api/v1/students/<int:user_id>", "api_student", api_response)
+app.add_url_rule("/api/v1/stats", "api_stats_resource", api_response)
+app.add_url_rule("/api/v1/deadline", "api_deadline_resource", api_response)
+app.add_url_rule("/api/v1/trends", "api_trends_resource", api_response)
+
+
+@app.route("/api/v1/batch", methods=["POST"])
+def api_batch():
+    """
+    Several GETs in one round trip, answered in order:
+    {"responses": [{"id": "a", "status": 200, "body": {...}}, ...]}
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Body must be a JSON object"}), 400
+
+    requests_ = payload.get("requests")
+
+    if not isinstance(requests_, list) or not requests_:
+        return jsonify({"error": "No requests given"}), 400
+    if len(requests_) > API_MAX_BATCH:
+        return jsonify({"error": f"At most {API_MAX_BATCH} requests per batch"}), 400
+
+    adapter = app.url_map.bind("localhost")
+    responses = []
+
+    for item in requests_:
+        path = item.get("path") if isinstance(item, dict) else None
+
+        if not isinstance(path, str):
+            body, status = {"error": "Each request needs a string path"}, 400
+        else:
+            path, _, query = path.partition("?")
+
+            try:
+                endpoint, view_args = adapter.match(path, method="GET")
+            except HTTPException:
+                endpoint, view_args = None, {}
+
+            if endpoint in API_RESOURCES:
+                body, status = call_api(endpoint, MultiDict(parse_qsl(query)), view_args)
+            else:
+                body, status = {"error": "Unknown resource"}, 404
+
+        responses.append({
+            "id": item.get("id") if isinstance(item, dict) else None,
+            "status": status,
+            "body": body,
+        })
+
+    return jsonify({"responses": responses})
+
+
+# ==================================================
+# METRICS
+# ==================================================
+
+@app.route("/metrics")
+def metrics_endpoint():
+    token = app.config["METRICS_TOKEN"]
+    authorized = session.get("role") == "admin" or (
+        token and request.headers.get("Authorization") == f"Bearer {token}"
+    )
+    if not authorized:
+        abort(404)
+
+    return app.response_class(
+        metrics.render(),
+        mimetype="text/plain; version=0.0.4"
+    )
+
 
 # ==================================================
 # RUN
 # ==================================================
 
 if __name__ == "__main__":
+    # Local development: bring the database up to date first
+    with app.app_context():
+        migrations.upgrade(db)
+        create_default_admin()
+        create_default_deadline()
+    move_legacy_uploads()
+
     app.run(host="0.0.0.0", port=10000)
 
 
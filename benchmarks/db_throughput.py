@@ -0,0 +1,141 @@
+"""
+Concurrent read/write throughput on SQLite, default vs tuned engine.
+
+Several processes (standing in for gunicorn workers) hammer a scratch
+database with a submission-week mix of reads and small write
+transactions. "default" is a bare create_engine(); "tuned" uses the
+engine layer in utils/database.py (WAL, busy timeout, pragmas, pool).
+
+    python benchmarks/db_throughput.py
+    python benchmarks/db_throughput.py --workers 8 --seconds 10 --write-ratio 0.3
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+import sqlalchemy as sa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import engine_options, configure_engine  # noqa: E402
+
+
+SCHEMA = """
+CREATE TABLE project (
+    id INTEGER PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    status VARCHAR(20),
+    student_id INTEGER
+)
+"""
+
+
+def make_engine(uri, mode):
+    if mode == "tuned":
+        return configure_engine(sa.create_engine(uri, **engine_options(uri)))
+    return sa.create_engine(uri)
+
+
+def seed(uri, rows):
+    engine = sa.create_engine(uri)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(SCHEMA)
+        conn.exec_driver_sql("CREATE INDEX ix_student ON project (student_id)")
+        conn.execute(
+            sa.text("INSERT INTO project (title, status, student_id) VALUES (:t, 'pending', :s)"),
+            [{"t": f"Project {i}", "s": i % 1000} for i in range(rows)]
+        )
+    engine.dispose()
+
+
+def worker(uri, mode, seconds, write_ratio, results):
+    engine = make_engine(uri, mode)
+    rng = random.Random(os.getpid())
+
+    ops = errors = 0
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                with engine.begin() as conn:
+                    if rng.random() < 0.5:
+                        conn.execute(sa.text(
+                            "INSERT INTO project (title, status, student_id) VALUES ('new', 'pending', :s)"
+                        ), {"s": rng.randrange(1000)})
+                    else:
+                        conn.execute(sa.text(
+                            "UPDATE project SET status = 'approved' WHERE id = :id"
+                        ), {"id": rng.randrange(1, 10000)})
+            else:
+                with engine.connect() as conn:
+                    conn.execute(sa.text(
+                        "SELECT * FROM project WHERE student_id = :s"
+                    ), {"s": rng.randrange(1000)}).fetchall()
+                    conn.execute(sa.text(
+                        "SELECT status, COUNT(*) FROM project GROUP BY status"
+                    )).fetchall()
+            ops += 1
+            latencies.append(time.perf_counter() - started)
+        except sa.exc.OperationalError:
+            # "database is locked"
+            errors += 1
+
+    results.put((ops, errors, latencies))
+
+
+def run(mode, workers, seconds, write_ratio, rows):
+    with tempfile.TemporaryDirectory() as directory:
+        uri = "sqlite:///" + os.path.join(directory, "bench.db")
+        seed(uri, rows)
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker, args=(uri, mode, seconds, write_ratio, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    ops = sum(c[0] for c in collected)
+    errors = sum(c[1] for c in collected)
+    latencies = sorted(l for c in collected for l in c[2]) or [0]
+
+    return {
+        "ops_per_sec": ops / seconds,
+        "errors": errors,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'ops/s':>9} {'locked':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in ("default", "tuned"):
+        result = run(mode, args.workers, args.seconds, args.write_ratio, args.rows)
+        print(
+            f"{mode:>8} {result['ops_per_sec']:>9.0f} {result['errors']:>7}"
+            f" {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
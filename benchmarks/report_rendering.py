@@ -0,0 +1,60 @@
+"""
+Single-process vs multi-process PDF report rendering.
+
+Renders the projects report from synthetic rows (no database reads),
+so the numbers only measure drawing + merging.
+
+    python benchmarks/report_rendering.py
+    python benchmarks/report_rendering.py --rows 10000 100000 --processes 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from utils.reports import render_report, render_report_parallel  # noqa: E402
+
+
+def synthetic_rows(count):
+    statuses = ("pending", "approved", "rejected")
+    for i in range(count):
+        yield (f"Student {i}", f"Project title number {i}", statuses[i % 3])
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--processes", type=int, nargs="+", default=[os.cpu_count() or 2])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'mode':>12} {'seconds':>9} {'speedup':>8}")
+
+    with app.app_context(), tempfile.TemporaryDirectory() as out_dir:
+        for count in args.rows:
+            path = os.path.join(out_dir, "single.pdf")
+            single = timed(render_report, "projects", synthetic_rows(count), path)
+            print(f"{count:>8} {'1 process':>12} {single:>9.2f} {1:>8.2f}")
+
+            for processes in args.processes:
+                path = os.path.join(out_dir, f"parallel-{processes}.pdf")
+                seconds = timed(
+                    render_report_parallel,
+                    "projects", synthetic_rows(count), path, processes
+                )
+                label = f"{processes} processes"
+                print(f"{count:>8} {label:>12} {seconds:>9.2f} {single / seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Deadline-rush load test: many students uploading over slow links at once.
+
+Starts gunicorn with gunicorn.conf.py against a scratch database and
+upload folder, logs one student in, then opens --clients connections
+that each trickle a multipart project submission to
+/student/create_project over --upload-seconds. While they run, a probe
+requests /login every 100 ms to show whether other users still get
+served. Each worker class in --worker-classes is measured in turn.
+
+    python benchmarks/slow_uploads.py
+    python benchmarks/slow_uploads.py --clients 200 --worker-classes sync gthread
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare(directory):
+    """Scratch DB (schema via the app's migrations) with an open deadline."""
+    env = {
+        **os.environ,
+        "DATABASE_URL": "sqlite:///" + os.path.join(directory, "bench.db"),
+        "UPLOAD_FOLDER": os.path.join(directory, "uploads"),
+    }
+    for command in ("db-upgrade", "seed"):
+        subprocess.run(
+            [sys.executable, "-m", "flask", "--app", "app", command],
+            cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+
+    conn = sqlite3.connect(os.path.join(directory, "bench.db"))
+    conn.execute(
+        "UPDATE submission_deadline SET deadline = ?",
+        ((datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S.%f"),)
+    )
+    conn.commit()
+    conn.close()
+    return env
+
+
+async def request(port, raw):
+    """Send raw bytes, return (status, headers text)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    writer.close()
+    return int(head.split()[1]), head.decode("latin-1")
+
+
+async def login(port):
+    # A throwaway student, registered and logged in over HTTP
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    form = (
+        f"name=Bench&email={email}&password=pw&level=400&programme=IT"
+        f"&department=CS&session_type=Regular"
+    ).replace("@", "%40")
+    for path in ("/register", "/login"):
+        body = form if path == "/register" else f"email={email.replace('@', '%40')}&password=pw"
+        status, head = await request(port, (
+            f"POST {path} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n"
+            f"Content-Type: application/x-www-form-urlencoded\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n{body}"
+        ).encode())
+    cookie = re.search(r"Set-Cookie: (session=[^;]+)", head, re.I)
+    if not cookie:
+        raise RuntimeError("login failed")
+    return cookie.group(1)
+
+
+def upload_body(size):
+    boundary = "benchboundary" + uuid.uuid4().hex
+    parts = b"".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in (("title", "Load test"), ("description", "Slow upload"))
+    )
+    parts += (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="report.pdf"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + os.urandom(size) + f"\r\n--{boundary}--\r\n".encode()
+    return boundary, parts
+
+
+async def slow_upload(port, cookie, size, seconds, chunks):
+    boundary, body = upload_body(size)
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write((
+            f"POST /student/create_project HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n"
+            f"Cookie: {cookie}\r\n"
+            f"Content-Type: multipart/form-data; boundary={boundary}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode())
+
+        step = -(-len(body) // chunks)
+        for offset in range(0, len(body), step):
+            writer.write(body[offset:offset + step])
+            await writer.drain()
+            await asyncio.sleep(seconds / chunks)
+
+        head = await reader.readuntil(b"\r\n\r\n")
+        writer.close()
+        status = int(head.split()[1])
+    except (OSError, asyncio.IncompleteReadError):
+        status = None
+
+    return status, time.perf_counter() - started
+
+
+async def probe(port, stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            status, _ = await asyncio.wait_for(request(port, (
+                b"GET /login HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n"
+            )), timeout=60)
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        await asyncio.sleep(0.1)
+
+
+async def drive(port, args):
+    cookie = await login(port)
+
+    stop = asyncio.Event()
+    probe_latencies = []
+    probe_task = asyncio.create_task(probe(port, stop, probe_latencies))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        slow_upload(port, cookie, args.size, args.upload_seconds, args.chunks)
+        for _ in range(args.clients)
+    ))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+
+    # The app redirects (302) back to the dashboard on success
+    ok = [latency for status, latency in results if status == 302]
+    return {
+        "ok": len(ok),
+        "failed": len(results) - len(ok),
+        "p50": percentile(ok, 0.50),
+        "p99": percentile(ok, 0.99),
+        "probe_p50": percentile(probe_latencies, 0.50),
+        "probe_p99": percentile(probe_latencies, 0.99),
+        "elapsed": elapsed,
+    }
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def run(worker_class, args):
+    with tempfile.TemporaryDirectory() as directory:
+        env = prepare(directory)
+        env["WEB_WORKER_CLASS"] = worker_class
+        if args.workers:
+            env["WEB_CONCURRENCY"] = str(args.workers)
+
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+             "--bind", f"127.0.0.1:{port}", "app:app"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(port)
+            return asyncio.run(drive(port, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=256 * 1024, help="bytes per upload")
+    parser.add_argument("--upload-seconds", type=float, default=10)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--workers", type=int, help="WEB_CONCURRENCY (default: gunicorn.conf.py)")
+    parser.add_argument("--worker-classes", nargs="+", default=["sync", "gthread", "gevent"])
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients x {args.size // 1024} KB over {args.upload_seconds:g}s each\n"
+        f"{'worker':>8} {'ok':>5} {'failed':>6} {'p50 s':>7} {'p99 s':>7}"
+        f" {'probe p50':>10} {'probe p99':>10} {'wall s':>7}"
+    )
+    for worker_class in args.worker_classes:
+        r = run(worker_class, args)
+        print(
+            f"{worker_class:>8} {r['ok']:>5} {r['failed']:>6} {r['p50']:>7.2f} {r['p99']:>7.2f}"
+            f" {r['probe_p50'] * 1000:>8.0f}ms {r['probe_p99'] * 1000:>8.0f}ms {r['elapsed']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
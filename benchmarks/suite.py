@@ -0,0 +1,441 @@
+"""
+Reproducible benchmark suite: routes, a real server and the PDF reports.
+
+Seeds a synthetic database at the chosen scale, then measures
+
+  client.*   main routes through the Flask test client (latency and SQL
+             statements per request, read from the Server-Timing header)
+  server.*   a request mix against gunicorn with several workers
+  pdf.*      generate_projects_report_pdf / generate_students_report_pdf
+
+and writes the results as JSON. Pass --compare with an earlier result to
+fail (exit status 1) when a median latency, throughput or report time got
+worse than --threshold allows; SQL statement counts and errors must not
+grow at all.
+
+    python benchmarks/suite.py --scale small --output before.json
+    python benchmarks/suite.py --scale small --compare before.json
+    python benchmarks/suite.py --scale large --db /tmp/large.db   # seed once, reuse
+
+Scales: small = 1k users/projects, medium = 50k, large = 500k.
+"""
+
+import argparse
+import atexit
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCALES = {"small": 1_000, "medium": 50_000, "large": 500_000}
+
+PROGRAMMES = (
+    "BSc. Computer Science", "BSc. Information Technology",
+    "BSc. Computer Engineering", "BSc. Telecommunication Engineering",
+    "BSc. Business Administration",
+)
+WORDS = (
+    "smart", "network", "mobile", "banking", "system", "attendance", "library",
+    "health", "records", "blockchain", "voting", "traffic", "drone", "solar",
+    "inventory", "chatbot", "security", "payment", "farm", "analytics",
+)
+
+# Metrics checked by --compare. Tail latencies (p95/p99) and means are
+# recorded but too noisy between runs to gate on.
+COMPARED = {"p50_ms", "seconds", "requests_per_sec", "queries", "errors"}
+# ...of which a bigger number is better
+HIGHER_IS_BETTER = {"requests_per_sec"}
+
+
+# ==================================================
+# SEEDING
+# ==================================================
+
+def seed(db, User, Project, count, rng):
+    """Bulk-insert `count` students and `count` projects."""
+    from werkzeug.security import generate_password_hash
+    from utils import search
+
+    # One hash for everybody: hashing 500k passwords would dominate seeding
+    password = generate_password_hash("benchmark")
+    now = datetime.utcnow()
+    batch = 10_000
+
+    for start in range(0, count, batch):
+        db.session.execute(User.__table__.insert(), [
+            {
+                "name": f"Student {i}",
+                "email": f"student{i}@bench.gctu.edu.gh",
+                "password": password,
+                "level": str(rng.choice((100, 200, 300, 400))),
+                "programme": rng.choice(PROGRAMMES),
+                "department": "Computing",
+                "session_type": rng.choice(("Regular", "Evening", "Weekend")),
+                "role": "student",
+            }
+            for i in range(start, min(start + batch, count))
+        ])
+    db.session.commit()
+
+    student_ids = [i for (i,) in db.session.query(User.id).filter(User.role == "student")]
+
+    for start in range(0, count, batch):
+        rows = []
+        for i in range(start, min(start + batch, count)):
+            created = now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+            rows.append({
+                "title": " ".join(rng.sample(WORDS, 3)).title() + f" {i}",
+                "description": " ".join(rng.choices(WORDS, k=30)),
+                "status": rng.choice(("pending", "pending", "approved", "rejected")),
+                "student_id": rng.choice(student_ids),
+                "created_at": created,
+                "updated_at": created,
+            })
+        db.session.execute(Project.__table__.insert(), rows)
+    db.session.commit()
+
+    search.rebuild(db.session)
+    db.session.commit()
+
+
+# ==================================================
+# MEASURING
+# ==================================================
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    n = len(latencies)
+    return {
+        "iterations": n,
+        "mean_ms": round(sum(latencies) / n * 1000, 2),
+        "p50_ms": round(latencies[n // 2] * 1000, 2),
+        "p95_ms": round(latencies[min(n - 1, int(n * 0.95))] * 1000, 2),
+        "p99_ms": round(latencies[min(n - 1, int(n * 0.99))] * 1000, 2),
+    }
+
+
+def query_count(response):
+    # Server-Timing: db;dur=1.2;desc="3 queries", ...
+    timing = response.headers.get("Server-Timing", "")
+    marker = timing.find(' queries"')
+    if marker == -1:
+        return None
+    return int(timing[timing.rfind('"', 0, marker) + 1:marker])
+
+
+def session_cookie(app, user):
+    serializer = app.session_interface.get_signing_serializer(app)
+    return serializer.dumps({"user_id": user.id, "name": user.name, "role": user.role})
+
+
+def client_routes(app, admin, student, project_id, iterations, budget):
+    """Time each route through the test client."""
+    routes = {
+        "admin_dashboard": ("GET", "/admin/dashboard", admin),
+        "admin_students": ("GET", "/admin/students", admin),
+        "admin_view_student": ("GET", f"/admin/student/{student.id}", admin),
+        "admin_view_project": ("GET", f"/admin/view_project/{project_id}", admin),
+        "admin_search": ("GET", "/admin/search?q=smart+network", admin),
+        "student_dashboard": ("GET", "/student/dashboard", student),
+        "student_profile": ("GET", "/student/profile", student),
+        "create_project": ("POST", "/student/create_project", student),
+    }
+
+    results = {}
+    for name, (method, path, user) in routes.items():
+        client = app.test_client()
+        client.set_cookie("session", session_cookie(app, user))
+
+        data = {"title": "Benchmark", "description": "Benchmark run"} if method == "POST" else None
+        # Untimed first request: template compilation, cold caches
+        client.open(path, method=method, data=data)
+
+        latencies, queries = [], None
+        stop_at = time.perf_counter() + budget
+        while len(latencies) < iterations and (len(latencies) < 3 or time.perf_counter() < stop_at):
+            started = time.perf_counter()
+            response = client.open(path, method=method, data=data)
+            latencies.append(time.perf_counter() - started)
+
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name}: HTTP {response.status_code}")
+            queries = query_count(response)
+
+        results[f"client.{name}"] = {**summarize(latencies), "queries": queries}
+        print(f"  client.{name:<22} p50 {results[f'client.{name}']['p50_ms']:>9.2f} ms"
+              f"  queries {queries}")
+
+    return results
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_mix(app, env, admin, student, workers, concurrency, seconds):
+    """A read-heavy mix against gunicorn, from `concurrency` threads."""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "app:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    cookies = {"admin": session_cookie(app, admin), "student": session_cookie(app, student)}
+    mix = (
+        ("admin", "/admin/dashboard"),
+        ("admin", "/admin/search?q=mobile+banking"),
+        ("admin", f"/admin/student/{student.id}"),
+        ("student", "/student/dashboard"),
+        ("student", "/student/profile"),
+        ("student", "/login"),
+    )
+
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def run(stop_at, seed_value):
+        rng = random.Random(seed_value)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        mine, failed = [], 0
+        while time.perf_counter() < stop_at:
+            who, path = rng.choice(mix)
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Cookie": f"session={cookies[who]}"})
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+                else:
+                    mine.append(time.perf_counter() - started)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.time() > deadline:
+                    raise RuntimeError("gunicorn did not start")
+                time.sleep(0.2)
+
+        # Warm every worker up before timing
+        warm_until = time.perf_counter() + 1
+        threads = [threading.Thread(target=run, args=(warm_until, i)) for i in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        latencies.clear()
+        errors[0] = 0
+
+        stop_at = time.perf_counter() + seconds
+        threads = [threading.Thread(target=run, args=(stop_at, i)) for i in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    result = {
+        **summarize(latencies or [0]),
+        "requests": len(latencies),
+        "requests_per_sec": round(len(latencies) / seconds, 1),
+        "errors": errors[0],
+    }
+    del result["iterations"]
+    print(f"  server.mix  {result['requests_per_sec']} req/s  p50 {result['p50_ms']} ms"
+          f"  p99 {result['p99_ms']} ms  errors {result['errors']}")
+    return {"server.mix": result}
+
+
+def pdf_reports(generate_projects, generate_students, out_dir, rows):
+    results = {}
+    for name, generate in (("projects_report", generate_projects), ("students_report", generate_students)):
+        started = time.perf_counter()
+        generate(os.path.join(out_dir, f"{name}.pdf"))
+        seconds = time.perf_counter() - started
+        results[f"pdf.{name}"] = {"seconds": round(seconds, 3), "rows": rows}
+        print(f"  pdf.{name:<20} {seconds:>8.2f} s")
+    return results
+
+
+# ==================================================
+# COMPARING
+# ==================================================
+
+def compare(current, baseline, threshold):
+    """Return human-readable regressions of `current` against `baseline`."""
+    regressions = []
+
+    for name, metrics in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+
+        for metric, value in metrics.items():
+            old = before.get(metric)
+            if metric not in COMPARED or value is None or old is None:
+                continue
+
+            if metric in ("queries", "errors"):
+                worse = value > old
+            elif metric in HIGHER_IS_BETTER:
+                worse = value < old * (1 - threshold)
+            else:
+                worse = value > old * (1 + threshold)
+
+            if worse:
+                regressions.append(f"{name}.{metric}: {old} -> {value}")
+
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--rows", type=int, help="users and projects to seed (overrides --scale)")
+    parser.add_argument("--db", help="SQLite file to seed, or to reuse if it exists")
+    parser.add_argument("--iterations", type=int, default=50, help="requests per route")
+    parser.add_argument("--route-seconds", type=float, default=10, help="time budget per route")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads for the server mix")
+    parser.add_argument("--server-seconds", type=float, default=10)
+    parser.add_argument("--skip", nargs="*", default=[], choices=("client", "server", "pdf"))
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown before a metric counts as a regression")
+    args = parser.parse_args()
+
+    count = args.rows or SCALES[args.scale]
+    work_dir = tempfile.mkdtemp(prefix="gctu-bench-")
+    atexit.register(shutil.rmtree, work_dir, ignore_errors=True)
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(work_dir, "bench.db")
+    reuse = os.path.exists(db_path)
+
+    # The app reads these when it is imported
+    os.environ["DATABASE_URL"] = "sqlite:///" + db_path
+    os.environ["UPLOAD_FOLDER"] = os.path.join(work_dir, "uploads")
+    os.environ.setdefault("SLOW_QUERY_MS", "0")
+
+    from app import (
+        app, db, User, Project, SubmissionDeadline,
+        create_default_admin, create_default_deadline,
+        generate_projects_report_pdf, generate_students_report_pdf
+    )
+    import migrations
+
+    results = {}
+    with app.app_context():
+        migrations.upgrade(db)
+        create_default_admin()
+        create_default_deadline()
+
+        if not reuse:
+            print(f"Seeding {count} users and projects into {db_path}")
+            started = time.perf_counter()
+            seed(db, User, Project, count, random.Random(42))
+            results["seed"] = {"seconds": round(time.perf_counter() - started, 2), "rows": count}
+        else:
+            count = Project.query.count()
+            print(f"Reusing {db_path} ({count} projects)")
+
+        # Keep submissions open for create_project
+        for deadline in SubmissionDeadline.query:
+            deadline.deadline = datetime.utcnow() + timedelta(days=365)
+        db.session.commit()
+
+        admin = User.query.filter_by(role="admin").first()
+        # A student with a typical number of projects
+        student = db.session.get(User, Project.query.order_by(Project.id).first().student_id)
+        project_id = Project.query.order_by(Project.id.desc()).first().id
+        db.session.expunge_all()
+
+    if "client" not in args.skip:
+        print("Routes (test client)")
+        results.update(client_routes(app, admin, student, project_id, args.iterations, args.route_seconds))
+
+    if "server" not in args.skip:
+        print(f"Server ({args.workers} workers, {args.concurrency} clients)")
+        results.update(server_mix(
+            app, dict(os.environ), admin, student,
+            args.workers, args.concurrency, args.server_seconds
+        ))
+
+    if "pdf" not in args.skip:
+        print("PDF reports")
+        with app.app_context():
+            results.update(pdf_reports(
+                generate_projects_report_pdf, generate_students_report_pdf, work_dir, count
+            ))
+
+    report = {
+        "meta": {
+            "scale": args.rows or args.scale,
+            "rows": count,
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "started": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print("   " + line)
+            sys.exit(1)
+
+        print(f"✅ No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
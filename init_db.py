@@ -1,35 +1,20 @@
-import sqlite3
+# Creates or upgrades the app's schema in place, then seeds the default
+# admin and deadline. The tables come from the models in app.py; see
+# migrations.py. Same as the Procfile release step (db-upgrade, move-uploads, seed)
+from app import app, db, create_default_admin, create_default_deadline, move_legacy_uploads
+import migrations
 
-conn = sqlite3.connect("database.db")
-cur = conn.cursor()
+with app.app_context():
+    applied = migrations.upgrade(db)
+    create_default_admin()
+    create_default_deadline()
 
-# USERS TABLE
-cur.execute("""
-CREATE TABLE IF NOT EXISTS users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    email TEXT UNIQUE NOT NULL,
-    password TEXT NOT NULL,
-    role TEXT NOT NULL
-)
-""")
+moved = move_legacy_uploads()
 
-# PROJECTS TABLE
-cur.execute("""
-CREATE TABLE IF NOT EXISTS projects (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT NOT NULL,
-    description TEXT,
-    file TEXT,
-    status TEXT DEFAULT 'Pending',
-    feedback TEXT,
-    user_id INTEGER,
-    created_at TEXT,
-    FOREIGN KEY (user_id) REFERENCES users(id)
-)
-""")
+for version, description in applied:
+    print(f"✅ Applied migration {version}: {description}")
 
-conn.commit()
-conn.close()
+if moved:
+    print(f"✅ Moved {moved} upload(s) out of static/uploads")
 
 print("✅ Database initialized successfully")
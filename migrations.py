@@ -0,0 +1,176 @@
+"""
+Versioned schema migrations.
+
+Each migration is a numbered function that receives an open connection
+and the app's metadata. Applied versions are recorded in the
+`schema_migrations` table, so `upgrade()` only runs what is missing and
+an existing database is brought up to date in place.
+
+Migrations must be safe to re-run against a database that already has
+the change (create with checkfirst, inspect before altering) because a
+fresh database gets the latest schema straight from the models.
+
+Importing the app never touches the database. Pending migrations are
+applied by:  flask --app app db-upgrade   (the Procfile release step),
+python init_db.py, or python app.py (the development server).
+"""
+
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from utils import history, search
+
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+schema_migrations = sa.Table(
+    "schema_migrations",
+    sa.MetaData(),
+    sa.Column("version", sa.Integer, primary_key=True),
+    sa.Column("description", sa.String(200), nullable=False),
+    sa.Column("applied_at", sa.DateTime, nullable=False),
+)
+
+
+def create_indexes(conn, metadata, table_name, *index_names):
+    table = metadata.tables[table_name]
+    for index in table.indexes:
+        if index.name in index_names:
+            index.create(conn, checkfirst=True)
+
+
+def add_column(conn, metadata, table_name, column_name):
+    if column_name in {c["name"] for c in sa.inspect(conn).get_columns(table_name)}:
+        return
+
+    column = metadata.tables[table_name].c[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(sa.text(
+        f'ALTER TABLE "{table_name}" ADD COLUMN "{column_name}" {column_type}'
+    ))
+
+
+# ==================================================
+# MIGRATIONS
+# ==================================================
+
+@migration(1, "baseline schema")
+def baseline(conn, metadata):
+    metadata.create_all(conn, checkfirst=True)
+
+
+@migration(2, "indexes for hot filter and sort columns")
+def hot_column_indexes(conn, metadata):
+    create_indexes(
+        conn, metadata, "project",
+        "ix_project_student_created",
+        "ix_project_status_created",
+        "ix_project_created_id",
+    )
+    create_indexes(conn, metadata, "user", "ix_user_role")
+
+
+@migration(3, "content-addressed uploads")
+def content_addressed_uploads(conn, metadata):
+    add_column(conn, metadata, "project", "file_name")
+    create_indexes(conn, metadata, "project", "ix_project_file")
+
+
+@migration(4, "project updated_at for report versioning")
+def project_updated_at(conn, metadata):
+    add_column(conn, metadata, "project", "updated_at")
+    create_indexes(conn, metadata, "project", "ix_project_updated")
+
+
+@migration(5, "report job queue")
+def report_job_queue(conn, metadata):
+    metadata.tables["report_job"].create(conn, checkfirst=True)
+
+
+@migration(6, "report job params")
+def report_job_params(conn, metadata):
+    add_column(conn, metadata, "report_job", "params")
+
+
+@migration(7, "full-text search index")
+def full_text_search(conn, metadata):
+    if search.fts_enabled(conn):
+        search.rebuild(conn)
+
+
+
+@migration(8, "per-cohort submission deadlines")
+def cohort_deadlines(conn, metadata):
+    # Existing deadlines were entered in Accra time, which is UTC+0,
+    # so they are already the UTC values the app now expects
+    add_column(conn, metadata, "submission_deadline", "programme")
+    add_column(conn, metadata, "submission_deadline", "level")
+    create_indexes(conn, metadata, "submission_deadline", "ix_deadline_cohort")
+
+
+@migration(9, "submission event log and rollups")
+def submission_history(conn, metadata):
+    metadata.tables["submission_event"].create(conn, checkfirst=True)
+    metadata.tables["submission_rollup"].create(conn, checkfirst=True)
+    history.backfill(conn)
+
+
+@migration(10, "user updated_at for report versioning")
+def user_updated_at(conn, metadata):
+    add_column(conn, metadata, "user", "updated_at")
+    create_indexes(conn, metadata, "user", "ix_user_role_updated")
+
+# ==================================================
+# RUNNER
+# ==================================================
+
+def current_version(engine):
+    schema_migrations.create(engine, checkfirst=True)
+
+    with engine.connect() as conn:
+        version = conn.execute(
+            sa.select(sa.func.max(schema_migrations.c.version))
+        ).scalar()
+
+    return version or 0
+
+
+def upgrade(db):
+    """
+    Apply every pending migration, each in its own transaction.
+    Returns the list of (version, description) that were applied.
+    """
+    engine = db.engine
+    applied = []
+
+    for version, description, fn in MIGRATIONS:
+        if version <= current_version(engine):
+            continue
+
+        try:
+            with engine.begin() as conn:
+                fn(conn, db.metadata)
+                conn.execute(
+                    schema_migrations.insert().values(
+                        version=version,
+                        description=description,
+                        applied_at=datetime.utcnow()
+                    )
+                )
+        except sa.exc.IntegrityError:
+            # Another worker booting at the same time recorded it first
+            continue
+
+        applied.append((version, description))
+
+    return applied
@@ -0,0 +1,69 @@
+import threading
+import time
+
+
+class ReadThroughCache:
+    """
+    Small in-process cache in front of an expensive loader.
+
+    get() returns the cached value or calls loader(*key) to build it.
+    Concurrent misses on the same key are collapsed into ONE loader call:
+    the first caller computes while the rest wait on a per-key lock and
+    then reuse its result (no thundering herd).
+
+    Each gunicorn worker keeps its own copy, so `ttl` bounds how stale a
+    worker can be after another worker invalidates.
+    """
+
+    def __init__(self, loader, ttl=None):
+        self.loader = loader
+        self.ttl = ttl
+
+        self._values = {}
+        self._locks = {}
+        self._generation = 0
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _fresh(self, key):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+
+        value, stored_at = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            return None
+
+        return entry
+
+    def get(self, *key):
+        entry = self._fresh(key)
+        if entry:
+            return entry[0]
+
+        with self._lock_for(key):
+            # Another thread may have filled it while we waited
+            entry = self._fresh(key)
+            if entry:
+                return entry[0]
+
+            generation = self._generation
+            value = self.loader(*key)
+
+            # Don't store a result computed before an invalidation
+            if generation == self._generation:
+                self._values[key] = (value, time.monotonic())
+
+            return value
+
+    def invalidate(self, *key):
+        """Drop one key, or everything when called without a key."""
+        with self._guard:
+            self._generation += 1
+            if key:
+                self._values.pop(key, None)
+            else:
+                self._values.clear()
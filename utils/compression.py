@@ -0,0 +1,95 @@
+"""
+Response compression (brotli when installed and accepted, else gzip).
+
+    compress_response(response, request.accept_encodings)
+
+Only text-like bodies above MIN_SIZE are compressed, never partial
+(Range) responses or anything that already has a Content-Encoding.
+A compressed response gets a weak ETag: the bytes differ from the
+uncompressed variant, but Werkzeug compares If-None-Match weakly, so
+revalidation still answers 304.
+
+Static files change only on deploy, so their compressed bytes are kept
+in memory keyed by ETag and encoding instead of being recompressed on
+every request. brotli is optional (pip install brotli).
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE = {
+    "text/html", "text/css", "text/plain", "text/csv",
+    "application/javascript", "application/json", "image/svg+xml",
+}
+MIN_SIZE = 500
+
+# Dynamic pages are compressed on every request, so favour speed
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Cached static bodies are compressed once, so favour size
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+_static_cache = {}
+
+
+def choose_encoding(accept_encodings):
+    """accept_encodings: Werkzeug's parsed Accept-Encoding (request.accept_encodings)."""
+    if brotli and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compress(data, encoding, static):
+    if encoding == "br":
+        return brotli.compress(data, quality=STATIC_BROTLI_QUALITY if static else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=STATIC_GZIP_LEVEL if static else GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response, accept_encodings, static=False):
+    response.vary.add("Accept-Encoding")
+
+    if (
+        response.status_code != 200
+        or response.mimetype not in COMPRESSIBLE
+        or "Content-Encoding" in response.headers
+        or "Content-Range" in response.headers
+        or "X-Sendfile" in response.headers
+        or "X-Accel-Redirect" in response.headers
+        or (response.content_length is not None and response.content_length < MIN_SIZE)
+        or response.cache_control.no_transform
+    ):
+        return response
+
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    key = (etag, encoding) if static and etag else None
+
+    body = _static_cache.get(key) if key else None
+    if body is None:
+        # send_file responses stream from disk; read them in to compress
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < MIN_SIZE:
+            return response
+
+        body = _compress(data, encoding, static)
+        if key:
+            _static_cache[key] = body
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+
+    return response
@@ -0,0 +1,88 @@
+"""
+Engine setup shared by the web app, the CLI and the report workers.
+
+SQLite (the default) is opened in WAL mode with a busy timeout so
+concurrent gunicorn workers queue for the write lock instead of failing
+with "database is locked", and readers never block writers.
+Set DATABASE_URL (or SQLALCHEMY_DATABASE_URI) to use a server database.
+"""
+
+import os
+
+from sqlalchemy import event
+
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    # Durable at checkpoints; safe with WAL and much cheaper than FULL
+    "synchronous": "NORMAL",
+    # Negative = KiB, so about 64 MB of page cache per connection
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def database_uri(default):
+    uri = os.environ.get("DATABASE_URL") or os.environ.get("SQLALCHEMY_DATABASE_URI")
+    if not uri:
+        return default
+
+    # Heroku/Render still hand out the old scheme SQLAlchemy rejects
+    if uri.startswith("postgres://"):
+        uri = "postgresql://" + uri[len("postgres://"):]
+
+    return uri
+
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for `uri`, tunable through env vars."""
+    if uri in ("sqlite://", "sqlite:///:memory:"):
+        # In-memory databases live in a single connection; keep the default pool
+        return {}
+
+    options = {
+        "pool_size": env_int("DB_POOL_SIZE", 5),
+        "max_overflow": env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": env_int("DB_POOL_TIMEOUT", 30),
+    }
+
+    if uri.startswith("sqlite"):
+        options["connect_args"] = {
+            # Seconds sqlite3 waits for a lock before raising
+            "timeout": env_int("SQLITE_BUSY_TIMEOUT_MS", 15000) / 1000,
+            # Pooled connections may be handed to another thread
+            "check_same_thread": False,
+        }
+    else:
+        options["pool_pre_ping"] = True
+        options["pool_recycle"] = env_int("DB_POOL_RECYCLE", 1800)
+
+    return options
+
+
+def configure_engine(engine, pragmas=None):
+    """
+    Hook SQLite pragmas onto new connections, and give every forked
+    process (gunicorn worker, report worker) its own connection pool.
+    """
+    if engine.dialect.name == "sqlite":
+        pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    # Connections inherited across fork() must never be used by the child
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
+    return engine
@@ -0,0 +1,283 @@
+"""
+Submission history: an append-only event log plus daily rollups.
+
+Every submission and review transition is appended to submission_event
+and never updated or deleted, so a project's history survives edits and
+deletion. The programme and department are copied onto the event, so
+later profile changes don't rewrite the past.
+
+submission_rollup holds per-day counters for three scopes:
+
+    scope="all"         name=""             the whole system
+    scope="programme"   name=<programme>
+    scope="department"  name=<department>
+
+record() appends the events and bumps the matching rollup rows with one
+upsert, in the caller's transaction. Reads (trend(), breakdown()) then
+touch a few rows per day instead of scanning project. Days are UTC dates.
+
+Turnaround is the time from a project's latest (re)submission to the
+first review that takes it out of "pending". It is stored on the review
+event and summed into the rollup (review_seconds / reviewed).
+
+Like utils/search.py, every function takes anything with .execute(), so
+it works with a Session (routes) or a Connection (migrations).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, text
+
+
+# Event kinds that have a rollup counter (the column of the same name)
+COUNTED_KINDS = ("submitted", "resubmitted", "approved", "rejected", "deleted")
+REVIEW_KINDS = ("approved", "rejected")
+
+SCOPES = ("programme", "department")
+
+ROLLUP_COLUMNS = COUNTED_KINDS + ("reviewed", "review_seconds")
+
+
+def event(project_id, student_id, kind, from_status=None, to_status=None,
+          programme=None, department=None, created_at=None):
+    """One event row, ready for record()."""
+    return {
+        "project_id": project_id,
+        "student_id": student_id,
+        "kind": kind,
+        "from_status": from_status,
+        "to_status": to_status,
+        "programme": programme,
+        "department": department,
+        "created_at": created_at or datetime.utcnow(),
+        "turnaround_seconds": None,
+    }
+
+
+def _last_submissions(conn, project_ids):
+    """project_id -> when it was last (re)submitted."""
+    if not project_ids:
+        return {}
+
+    rows = conn.execute(
+        text("""
+            SELECT project_id, MAX(created_at)
+            FROM submission_event
+            WHERE project_id IN :ids AND kind IN ('submitted', 'resubmitted')
+            GROUP BY project_id
+        """).bindparams(bindparam("ids", expanding=True)),
+        {"ids": sorted(project_ids)}
+    )
+    return {project_id: _as_datetime(submitted) for project_id, submitted in rows}
+
+
+def _as_datetime(value):
+    # SQLite hands back text from raw SQL
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _scopes(item):
+    yield "all", ""
+    for scope in SCOPES:
+        if item[scope]:
+            yield scope, item[scope]
+
+
+def record(conn, events):
+    """Append `events` (see event()) and update the rollups."""
+    if not events:
+        return
+
+    reviews = [
+        item for item in events
+        if item["kind"] in REVIEW_KINDS and item["from_status"] == "pending"
+    ]
+    submitted = _last_submissions(conn, {item["project_id"] for item in reviews})
+    for item in reviews:
+        if item["project_id"] in submitted:
+            seconds = (item["created_at"] - submitted[item["project_id"]]).total_seconds()
+            item["turnaround_seconds"] = max(0.0, seconds)
+
+    _insert_events(conn, events)
+    _add_to_rollups(conn, events)
+
+
+def _insert_events(conn, events):
+    conn.execute(
+        text("""
+            INSERT INTO submission_event
+                (project_id, student_id, kind, from_status, to_status,
+                 programme, department, turnaround_seconds, created_at)
+            VALUES
+                (:project_id, :student_id, :kind, :from_status, :to_status,
+                 :programme, :department, :turnaround_seconds, :created_at)
+        """),
+        events
+    )
+
+
+def _add_to_rollups(conn, events):
+    # Sum the batch first: one upsert row per (scope, name, day)
+    deltas = defaultdict(lambda: dict.fromkeys(ROLLUP_COLUMNS, 0))
+    for item in events:
+        # Re-saving a review without changing it is history, not a transition
+        if item["kind"] not in COUNTED_KINDS or item["from_status"] == item["to_status"]:
+            continue
+
+        day = str(item["created_at"])[:10]
+        for scope, name in _scopes(item):
+            delta = deltas[scope, name, day]
+            delta[item["kind"]] += 1
+            if item["turnaround_seconds"] is not None:
+                delta["reviewed"] += 1
+                delta["review_seconds"] += item["turnaround_seconds"]
+
+    if not deltas:
+        return
+
+    # ON CONFLICT ... DO UPDATE works on SQLite 3.24+ and PostgreSQL
+    conn.execute(
+        text(f"""
+            INSERT INTO submission_rollup (scope, name, day, {", ".join(ROLLUP_COLUMNS)})
+            VALUES (:scope, :name, :day, {", ".join(":" + c for c in ROLLUP_COLUMNS)})
+            ON CONFLICT (scope, name, day) DO UPDATE SET
+                {", ".join(f"{c} = submission_rollup.{c} + excluded.{c}" for c in ROLLUP_COLUMNS)}
+        """),
+        [
+            {"scope": scope, "name": name, "day": day, **delta}
+            for (scope, name, day), delta in deltas.items()
+        ]
+    )
+
+
+def rebuild(conn):
+    """Recompute every rollup from the event log."""
+    conn.execute(text("DELETE FROM submission_rollup"))
+
+    events = conn.execute(text("""
+        SELECT kind, from_status, to_status, programme, department,
+               turnaround_seconds, created_at
+        FROM submission_event
+    """)).mappings()
+    _add_to_rollups(conn, list(events))
+
+
+def backfill(conn):
+    """
+    Seed the log from the current project table, for databases that
+    predate it: a submission at created_at and, for reviewed projects,
+    the review at updated_at (turnaround unknown when that is NULL).
+    Deleted projects left no trace to recover.
+    """
+    if conn.execute(text("SELECT 1 FROM submission_event LIMIT 1")).first():
+        return
+
+    projects = conn.execute(text("""
+        SELECT p.id, p.student_id, p.status, p.created_at, p.updated_at,
+               u.programme, u.department
+        FROM project p LEFT JOIN "user" u ON u.id = p.student_id
+    """)).mappings()
+
+    events = []
+    for row in projects:
+        created_at = _as_datetime(row["created_at"]) or datetime.utcnow()
+        common = {
+            "project_id": row["id"],
+            "student_id": row["student_id"],
+            "programme": row["programme"],
+            "department": row["department"],
+        }
+        events.append(event(
+            kind="submitted", to_status="pending", created_at=created_at, **common
+        ))
+
+        if row["status"] in REVIEW_KINDS:
+            # updated_at is NULL on rows older than migration 4: the review
+            # time is unknown, so log it at created_at without a turnaround
+            reviewed_at = _as_datetime(row["updated_at"])
+            review = event(
+                kind=row["status"], from_status="pending", to_status=row["status"],
+                created_at=reviewed_at or created_at, **common
+            )
+            if reviewed_at:
+                review["turnaround_seconds"] = max(0.0, (reviewed_at - created_at).total_seconds())
+            events.append(review)
+
+    if events:
+        _insert_events(conn, events)
+    rebuild(conn)
+
+
+# ==================================================
+# READS
+# ==================================================
+
+def _summary(row):
+    reviewed = row["reviewed"] or 0
+    return {
+        **{kind: int(row[kind] or 0) for kind in COUNTED_KINDS},
+        "reviewed": int(reviewed),
+        "avg_turnaround_hours": (
+            round(row["review_seconds"] / reviewed / 3600, 1) if reviewed else None
+        ),
+    }
+
+
+def trend(conn, days=30, scope="all", name=""):
+    """One entry per day (oldest first) for the last `days` days, gaps filled with zeros."""
+    today = datetime.utcnow().date()
+    since = today - timedelta(days=days - 1)
+
+    rows = conn.execute(
+        text(f"""
+            SELECT day, {", ".join(ROLLUP_COLUMNS)}
+            FROM submission_rollup
+            WHERE scope = :scope AND name = :name AND day >= :since
+        """),
+        {"scope": scope, "name": name, "since": since.isoformat()}
+    ).mappings()
+    by_day = {str(row["day"])[:10]: row for row in rows}
+
+    empty = dict.fromkeys(ROLLUP_COLUMNS, 0)
+    series = []
+    for offset in range(days):
+        day = (since + timedelta(days=offset)).isoformat()
+        series.append({"day": day, **_summary(by_day.get(day, empty))})
+    return series
+
+
+def breakdown(conn, scope, days=None):
+    """Totals per programme or department, over the last `days` days (None = all time)."""
+    where = ""
+    params = {"scope": scope}
+    if days:
+        where = "AND day >= :since"
+        params["since"] = (datetime.utcnow().date() - timedelta(days=days - 1)).isoformat()
+
+    rows = conn.execute(
+        text(f"""
+            SELECT name, {", ".join(f"SUM({c}) AS {c}" for c in ROLLUP_COLUMNS)}
+            FROM submission_rollup
+            WHERE scope = :scope {where}
+            GROUP BY name
+            ORDER BY name
+        """),
+        params
+    ).mappings()
+
+    return [{"name": row["name"], **_summary(row)} for row in rows]
+
+
+def project_history(conn, project_id):
+    rows = conn.execute(
+        text("""
+            SELECT kind, from_status, to_status, turnaround_seconds, created_at
+            FROM submission_event
+            WHERE project_id = :project_id
+            ORDER BY id
+        """),
+        {"project_id": project_id}
+    ).mappings()
+
+    return [{**row, "created_at": _as_datetime(row["created_at"])} for row in rows]
@@ -0,0 +1,250 @@
+"""
+Request, SQL and template timing, exposed in Prometheus text format.
+
+    metrics = Metrics()
+    metrics.init_app(app, db.engine, slow_query_ms=100)
+
+Per request it records latency, the number of SQL statements and the
+time spent in them (SQLAlchemy cursor events), and template render time
+(Flask's template signals), all as histograms labelled by endpoint.
+Statements slower than `slow_query_ms` are written to the "slow_query"
+logger with the endpoint that ran them. Each response also carries a
+Server-Timing header so the numbers show up in the browser dev tools.
+
+Every process keeps its own numbers. Under several gunicorn workers, set
+`shared_dir` (METRICS_DIR): each worker then writes a snapshot there at
+most once a second and render() adds them all up, so one scrape sees the
+whole server. Snapshots of exited workers are kept because their
+counts are part of the cumulative totals.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import g, has_app_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+slow_query_log = logging.getLogger("slow_query")
+
+
+class Histogram:
+
+    def __init__(self, name, description, buckets, labelnames):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labelnames = labelnames
+        # label values -> [count per bucket..., +Inf count, sum]
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def render(self, series):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+
+        for labels, values in sorted(series.items()):
+            label_text = ",".join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)
+            )
+            prefix = label_text + "," if label_text else ""
+
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+
+            braces = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}_sum{braces} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{braces} {cumulative}")
+
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+
+    def __init__(self):
+        self.histograms = {
+            h.name: h for h in (
+                Histogram(
+                    "http_request_duration_seconds", "Request latency.",
+                    LATENCY_BUCKETS, ("endpoint", "method", "status")
+                ),
+                Histogram(
+                    "http_request_sql_queries", "SQL statements run per request.",
+                    COUNT_BUCKETS, ("endpoint",)
+                ),
+                Histogram(
+                    "http_request_sql_seconds", "Time spent in SQL per request.",
+                    LATENCY_BUCKETS, ("endpoint",)
+                ),
+                Histogram(
+                    "sql_query_duration_seconds", "Latency of single SQL statements.",
+                    LATENCY_BUCKETS, ()
+                ),
+                Histogram(
+                    "template_render_seconds", "Template render time.",
+                    LATENCY_BUCKETS, ("template",)
+                ),
+            )
+        }
+        self.lock = threading.Lock()
+        self.shared_dir = None
+        self.slow_query_seconds = None
+        self._last_dump = 0.0
+
+    def observe(self, name, labels, value):
+        with self.lock:
+            self.histograms[name].observe(labels, value)
+
+    # ---------- wiring ----------
+
+    def init_app(self, app, engine, slow_query_ms=100, shared_dir=None):
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms else None
+        self.shared_dir = shared_dir
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+
+    def _start_request(self):
+        g.metrics = {"started": time.perf_counter(), "sql_count": 0, "sql_seconds": 0.0,
+                     "template_seconds": 0.0, "templates": []}
+
+    def _finish_request(self, response):
+        state = g.pop("metrics", None)
+        if state is None:
+            return response
+
+        elapsed = time.perf_counter() - state["started"]
+        endpoint = request.endpoint or "unmatched"
+
+        with self.lock:
+            self.histograms["http_request_duration_seconds"].observe(
+                (endpoint, request.method, str(response.status_code)), elapsed
+            )
+            self.histograms["http_request_sql_queries"].observe((endpoint,), state["sql_count"])
+            self.histograms["http_request_sql_seconds"].observe((endpoint,), state["sql_seconds"])
+
+        response.headers["Server-Timing"] = (
+            f'db;dur={state["sql_seconds"] * 1000:.1f};desc="{state["sql_count"]} queries", '
+            f'tpl;dur={state["template_seconds"] * 1000:.1f}, '
+            f'app;dur={elapsed * 1000:.1f}'
+        )
+
+        self._maybe_dump()
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        self.observe("sql_query_duration_seconds", (), elapsed)
+
+        state = g.get("metrics") if has_app_context() else None
+        if state is not None:
+            state["sql_count"] += 1
+            state["sql_seconds"] += elapsed
+
+        if self.slow_query_seconds is not None and elapsed >= self.slow_query_seconds:
+            # Parameters are left out: they can hold password hashes
+            slow_query_log.warning(
+                "%.1f ms [%s] %s",
+                elapsed * 1000,
+                request.endpoint if state is not None else "-",
+                " ".join(statement.split())[:2000]
+            )
+
+    def _before_render(self, sender, template, context, **extra):
+        state = g.get("metrics")
+        if state is not None:
+            state["templates"].append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        state = g.get("metrics")
+        if state is None or not state["templates"]:
+            return
+
+        elapsed = time.perf_counter() - state["templates"].pop()
+        state["template_seconds"] += elapsed
+        self.observe("template_render_seconds", (template.name or "string",), elapsed)
+
+    # ---------- exposition ----------
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {json.dumps(labels): list(values) for labels, values in h.series.items()}
+                for name, h in self.histograms.items()
+            }
+
+    def _maybe_dump(self):
+        if not self.shared_dir or time.monotonic() - self._last_dump < 1:
+            return
+        self._last_dump = time.monotonic()
+
+        path = os.path.join(self.shared_dir, f"{os.getpid()}.json")
+        temp = path + ".tmp"
+        with open(temp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temp, path)
+
+    def _collect(self):
+        snapshots = {os.getpid(): self.snapshot()}
+
+        if self.shared_dir:
+            for name in os.listdir(self.shared_dir):
+                pid, ext = os.path.splitext(name)
+                if ext != ".json" or not pid.isdigit() or int(pid) in snapshots:
+                    continue
+                try:
+                    with open(os.path.join(self.shared_dir, name)) as f:
+                        snapshots[int(pid)] = json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+        merged = {name: {} for name in self.histograms}
+        for snapshot in snapshots.values():
+            for name, series in snapshot.items():
+                for labels, values in series.items():
+                    key = tuple(json.loads(labels))
+                    total = merged[name].setdefault(key, [0] * len(values))
+                    merged[name][key] = [a + b for a, b in zip(total, values)]
+
+        return merged
+
+    def render(self):
+        merged = self._collect()
+        lines = []
+        for name, histogram in self.histograms.items():
+            lines.extend(histogram.render(merged[name]))
+        return "\n".join(lines) + "\n"
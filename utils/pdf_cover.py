@@ -0,0 +1,89 @@
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from datetime import datetime
+from functools import lru_cache
+import hashlib
+import os
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGO_PATH = os.path.join(BASE_DIR, "static", "images", "gctu_logo.png")
+
+
+@lru_cache(maxsize=1)
+def gctu_logo():
+    """
+    The logo, decoded once per process (None if the file is missing).
+    """
+    if not os.path.exists(LOGO_PATH):
+        return None
+    return ImageReader(LOGO_PATH)
+
+
+def _draw_header(c, subtitle, footer):
+    width, height = A4
+
+    logo = gctu_logo()
+    if logo:
+        c.drawImage(
+            logo,
+            width / 2 - 4 * cm,
+            height - 5.5 * cm,
+            width=8 * cm,
+            preserveAspectRatio=True,
+            mask="auto"
+        )
+
+    # University name
+    c.setFont("Helvetica-Bold", 18)
+    c.drawCentredString(
+        width / 2,
+        height - 8.5 * cm,
+        "GHANA COMMUNICATION TECHNOLOGY UNIVERSITY"
+    )
+
+    # System name
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(
+        width / 2,
+        height - 10 * cm,
+        "PROJECT SUBMISSION SYSTEM"
+    )
+
+    # Page subtitle
+    c.setFont("Helvetica", 12)
+    c.drawCentredString(width / 2, height - 11.5 * cm, subtitle)
+
+    # Generated date
+    c.setFont("Helvetica", 10)
+    c.drawCentredString(width / 2, 2.5 * cm, footer)
+
+
+def draw_gctu_header(c, subtitle, generated_at=None):
+    """
+    Draws the GCTU logo + titles on the current page
+    and returns where page content should start.
+
+    The header is recorded once per document as a form XObject and every
+    later page just references it, so the logo is embedded once and
+    long reports don't redraw it page after page.
+    """
+    generated_at = generated_at or datetime.now()
+    footer = f"Generated on {generated_at.strftime('%d %B %Y, %I:%M %p')}"
+
+    name = "gctuHeader" + hashlib.sha1(
+        f"{subtitle}|{footer}".encode()
+    ).hexdigest()[:12]
+
+    if not c.hasForm(name):
+        c.beginForm(name)
+        _draw_header(c, subtitle, footer)
+        c.endForm()
+
+    c.doForm(name)
+
+    # Same font state the header leaves behind when drawn directly
+    c.setFont("Helvetica", 10)
+
+    return A4[1] - 13 * cm
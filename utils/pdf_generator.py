@@ -1,29 +1,29 @@
-from app import BASE_DIR, User, Project
+from app import BASE_DIR, db, User, Project, stream_rows
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import cm
+from werkzeug.utils import secure_filename
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
 from datetime import datetime
+from types import SimpleNamespace
+from utils.pdf_cover import draw_gctu_header
+import io
 import os
+import zipfile
 
 
 
 def gctu_cover_page(output_path, student, project):
     c = canvas.Canvas(output_path, pagesize=A4)
-    width, height = A4
-
-    # Logo
-    logo_path = "static/images/gctu_logo.png"
-    if os.path.exists(logo_path):
-        c.drawImage(logo_path, width / 2 - 2 * cm, height - 4 * cm, 4 * cm, 4 * cm)
+    draw_cover_page(c, student, project)
+    c.save()
 
-    # Title
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(width / 2, height - 6 * cm, "GHANA COMMUNICATION TECHNOLOGY UNIVERSITY")
 
-    c.setFont("Helvetica", 12)
-    c.drawCentredString(width / 2, height - 7.2 * cm, "PROJECT SUBMISSION COVER PAGE")
+def draw_cover_page(c, student, project, generated_at=None):
+    """Draw one cover sheet on the next page of `c`."""
+    y = draw_gctu_header(c, "PROJECT SUBMISSION COVER PAGE", generated_at)
 
-    y = height - 9 * cm
     line_gap = 1.1 * cm
 
     details = [
@@ -34,7 +34,7 @@ def gctu_cover_page(output_path, student, project):
         ("Level", student.level),
         ("Session", student.session_type),
         ("Project Title", project.title),
-        ("Submission Date", datetime.now().strftime("%d %B %Y")),
+        ("Submission Date", (project.created_at or datetime.now()).strftime("%d %B %Y")),
     ]
 
     c.setFont("Helvetica", 11)
@@ -45,44 +45,10 @@ def gctu_cover_page(output_path, student, project):
         y -= line_gap
 
     c.showPage()
-    c.save()
-    
+
     
 def add_gctu_cover(c):
-    width, height = A4
-
-    logo_path = os.path.join(BASE_DIR, "static", "images", "gctu_logo.png")
-    if os.path.exists(logo_path):
-        c.drawImage(
-            logo_path,
-            width / 2 - 3 * cm,
-            height - 6 * cm,
-            width=6 * cm,
-            preserveAspectRatio=True,
-            mask="auto"
-        )
-
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(
-        width / 2,
-        height - 8 * cm,
-        "GHANA COMMUNICATION TECHNOLOGY UNIVERSITY"
-    )
-
-    c.setFont("Helvetica", 12)
-    c.drawCentredString(
-        width / 2,
-        height - 9.5 * cm,
-        "ADMIN REPORT"
-    )
-
-    c.setFont("Helvetica", 10)
-    c.drawCentredString(
-        width / 2,
-        2 * cm,
-        f"Generated on {datetime.now().strftime('%d %B %Y, %I:%M %p')}"
-    )
-
+    draw_gctu_header(c, "ADMIN REPORT")
     c.showPage()
 
 
@@ -139,3 +105,114 @@ def generate_students_pdf():
 
     c.save()
     return file_path
+
+
+# ==================================================
+# BATCH COVER SHEETS
+# ==================================================
+
+COVER_SHEET_FILTERS = ("programme", "department", "level", "status")
+
+
+def cover_sheet_rows(programme=None, department=None, level=None, status=None):
+    """Projects (with their student) matching the filter, oldest first."""
+    statement = (
+        db.select(
+            Project.id.label("project_id"),
+            Project.title,
+            User.name,
+            User.email,
+            User.programme,
+            User.department,
+            User.level,
+            User.session_type,
+            Project.created_at,
+        )
+        .join(User, Project.student_id == User.id)
+        .order_by(Project.id)
+    )
+
+    if programme:
+        statement = statement.where(User.programme == programme)
+    if department:
+        statement = statement.where(User.department == department)
+    if level:
+        statement = statement.where(User.level == level)
+    if status:
+        statement = statement.where(Project.status == status)
+
+    return stream_rows(statement)
+
+
+def cover_sheet_subjects(row):
+    """(student, project) for gctu_cover_page from a cover_sheet_rows() row."""
+    student = SimpleNamespace(
+        name=row[2], email=row[3], programme=row[4],
+        department=row[5], level=row[6], session_type=row[7]
+    )
+    return student, SimpleNamespace(title=row[1], created_at=row[8])
+
+
+def render_cover_sheet(row):
+    """One cover sheet as PDF bytes. Runs inside a pool worker."""
+    student, project = cover_sheet_subjects(row)
+
+    buffer = io.BytesIO()
+    gctu_cover_page(buffer, student, project)
+
+    filename = f"{row[0]}_{secure_filename(student.name) or 'student'}.pdf"
+    return filename, buffer.getvalue()
+
+
+def render_in_pool(rows, processes):
+    """
+    Map render_cover_sheet over `rows` in a process pool, yielding results
+    in order as they finish. Rows are read in the calling thread and only
+    a small window is in flight, so the database cursor and memory stay
+    bounded however many sheets are requested.
+    """
+    window = processes * 8
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+
+        for row in rows:
+            pending.append(pool.submit(render_cover_sheet, tuple(row)))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate_cover_sheets(output_path, output_format="zip", processes=None, **filters):
+    """
+    Build a cover sheet for every project matching `filters` into one ZIP
+    (a PDF per project, rendered in a pool of `processes`) or one merged
+    PDF. Returns (path, count).
+    """
+    count = 0
+
+    if output_format == "pdf":
+        # One canvas for the whole batch: the header form XObject, and the
+        # logo inside it, is written once and every page references it.
+        # Each page is a few hundred bytes of text, so drawing them here
+        # beats rendering separate documents in a pool and merging them
+        c = canvas.Canvas(output_path, pagesize=A4)
+        generated_at = datetime.now()
+
+        for row in cover_sheet_rows(**filters):
+            draw_cover_page(c, *cover_sheet_subjects(row), generated_at)
+            count += 1
+
+        c.save()
+    else:
+        processes = processes or os.cpu_count() or 1
+        sheets = render_in_pool(cover_sheet_rows(**filters), processes)
+
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for filename, data in sheets:
+                archive.writestr(filename, data)
+                count += 1
+
+    return output_path, count
@@ -0,0 +1,120 @@
+"""
+Token-bucket rate limiting with swappable storage.
+
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per
+second; each attempt takes one. A backend only has to implement
+
+    take(key, capacity, rate) -> (allowed, retry_after_seconds)
+
+atomically. MemoryBackend is per process (each gunicorn worker counts on
+its own); RedisBackend shares buckets between workers and machines.
+"""
+
+import math
+import threading
+import time
+
+
+class MemoryBackend:
+
+    # Drop buckets that have been full (idle) for this long
+    PRUNE_EVERY = 1000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, math.ceil((1 - tokens) / rate)
+
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                self._prune(now)
+
+        return allowed, retry_after
+
+    def _prune(self, now):
+        for key, (tokens, updated) in list(self._buckets.items()):
+            if updated < now - 3600:
+                del self._buckets[key]
+
+
+class RedisBackend:
+    """Buckets in Redis, updated atomically by a Lua script."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+
+    tokens = math.min(capacity, tokens + (now - updated) * rate)
+
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url, prefix="ratelimit:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.script = self.client.register_script(self.SCRIPT)
+
+    def take(self, key, capacity, rate):
+        allowed, tokens = self.script(
+            keys=[self.prefix + key], args=[capacity, rate, time.time()]
+        )
+        if allowed:
+            return True, 0
+        return False, math.ceil((1 - float(tokens)) / rate)
+
+
+def backend_from_url(url):
+    """'memory' (default) or a redis:// URL."""
+    if not url or url == "memory":
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unknown rate limit storage: {url}")
+
+
+class RateLimiter:
+    """
+    Named limits over one backend:
+
+        limiter = RateLimiter(MemoryBackend(), {"login-ip": (20, 1 / 3)})
+        allowed, retry_after = limiter.hit("login-ip", request.remote_addr)
+    """
+
+    def __init__(self, backend, limits):
+        self.backend = backend
+        # name -> (capacity, refill tokens per second)
+        self.limits = limits
+
+    def hit(self, name, identity):
+        capacity, rate = self.limits[name]
+        return self.backend.take(f"{name}:{identity}", capacity, rate)
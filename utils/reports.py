@@ -0,0 +1,235 @@
+"""
+Table reports (students, projects) drawn with reportlab.
+
+Imported lazily by generate_students_report_pdf() and
+generate_projects_report_pdf() in app.py, so a process that never
+renders a report never loads reportlab.
+"""
+
+from app import app, db, User, Project, stream_rows
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from reportlab.lib.units import cm
+from datetime import datetime
+from utils.pdf_cover import draw_gctu_header
+import os
+
+
+# ==================================================
+# REPORT TABLE LAYOUT
+# ==================================================
+# Every page repeats the cover header and holds a fixed number of rows,
+# so a row set can be cut on page boundaries and the pieces rendered
+# independently (see render_report_parallel).
+
+ROW_HEIGHT = 0.7 * cm
+TABLE_TOP = A4[1] - 13 * cm
+TABLE_BOTTOM = 2.5 * cm
+
+
+def rows_per_page(first_page):
+    # The first page also carries the column headings
+    top = TABLE_TOP - ROW_HEIGHT if first_page else TABLE_TOP
+    return int((top - TABLE_BOTTOM) // ROW_HEIGHT) + 1
+
+
+def students_report_rows():
+    return db.select(User.name, User.programme, User.level).where(
+        User.role == "student"
+    ).order_by(User.id)
+
+
+def projects_report_rows():
+    # Student name comes from the join, not a lazy load per row
+    return db.select(
+        User.name.label("student_name"), Project.title, Project.status
+    ).outerjoin(User, Project.student_id == User.id).order_by(
+        Project.created_at, Project.id
+    )
+
+
+REPORT_TABLES = {
+    "students": {
+        "subtitle": "REGISTERED STUDENTS REPORT",
+        "columns": [("NAME", 2 * cm), ("PROGRAMME", 8 * cm), ("LEVEL", 14 * cm)],
+        "cells": lambda s: (s[0], s[1] or "-", s[2] or "-"),
+        "total_label": "Total Registered Students",
+        "rows": students_report_rows,
+    },
+    "projects": {
+        "subtitle": "SUBMITTED PROJECTS REPORT",
+        "columns": [("STUDENT", 2 * cm), ("PROJECT TITLE", 7 * cm), ("STATUS", 14 * cm)],
+        # Title is cut to prevent overflow
+        "cells": lambda p: (p[0] or "-", p[1][:40], p[2] or "-"),
+        "total_label": "Total Submitted Projects",
+        "rows": projects_report_rows,
+    },
+}
+
+
+def draw_report_pages(c, kind, rows, generated_at, first_page=True):
+    """
+    Draw `rows` onto whole pages of a table report.
+    first_page: start with the column headings (page 1 of the report).
+    Returns the number of rows drawn.
+    """
+    table = REPORT_TABLES[kind]
+
+    y = draw_gctu_header(c, table["subtitle"], generated_at)
+    capacity = rows_per_page(first_page)
+
+    if first_page:
+        c.setFont("Helvetica-Bold", 10)
+        for heading, x in table["columns"]:
+            c.drawString(x, y, heading)
+        y -= ROW_HEIGHT
+
+    c.setFont("Helvetica", 10)
+    on_page = 0
+    drawn = 0
+
+    for row in rows:
+        # New page only once there is another row to put on it
+        if on_page == capacity:
+            c.showPage()
+            y = draw_gctu_header(c, table["subtitle"], generated_at)
+            c.setFont("Helvetica", 10)
+            capacity = rows_per_page(False)
+            on_page = 0
+
+        for (_, x), value in zip(table["columns"], table["cells"](row)):
+            c.drawString(x, y, value)
+
+        y -= ROW_HEIGHT
+        on_page += 1
+        drawn += 1
+
+    return drawn
+
+
+def draw_report_total(c, kind, total):
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(2 * cm, 2 * cm, f"{REPORT_TABLES[kind]['total_label']}: {total}")
+
+
+def render_report(kind, rows, file_path, generated_at=None):
+    """Single-process render of an iterable of rows."""
+    c = canvas.Canvas(file_path, pagesize=A4, pageCompression=1)
+
+    total = draw_report_pages(c, kind, rows, generated_at or datetime.now())
+    draw_report_total(c, kind, total)
+
+    c.save()
+    return file_path
+
+
+# ==================================================
+# PARALLEL RENDERING (VERY LARGE REPORTS)
+# ==================================================
+# The row stream is cut into chunks of whole pages; a process pool
+# draws each chunk into its own PDF and the pieces are merged in order.
+# Needs pypdf for the merge.
+
+def render_report_chunk(kind, rows, file_path, generated_at, first_page, total):
+    """Render one chunk; `total` is only passed for the last chunk."""
+    c = canvas.Canvas(file_path, pagesize=A4, pageCompression=1)
+
+    draw_report_pages(c, kind, rows, generated_at, first_page)
+    if total is not None:
+        draw_report_total(c, kind, total)
+
+    c.save()
+    return file_path
+
+
+def page_chunks(rows, pages_per_chunk):
+    """Yield (first_page, [rows]) cut exactly on page boundaries."""
+    first_page = True
+    chunk = []
+    size = rows_per_page(True) + (pages_per_chunk - 1) * rows_per_page(False)
+
+    for row in rows:
+        chunk.append(tuple(row))
+        if len(chunk) == size:
+            yield first_page, chunk
+            first_page = False
+            chunk = []
+            size = pages_per_chunk * rows_per_page(False)
+
+    if chunk or first_page:
+        yield first_page, chunk
+
+
+def render_report_parallel(kind, rows, file_path, processes,
+                           pages_per_chunk=None, generated_at=None):
+    """
+    Render `rows` with `processes` worker processes.
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    by the chunk size rather than the size of the report.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from pypdf import PdfWriter
+    import tempfile
+
+    generated_at = generated_at or datetime.now()
+    pages_per_chunk = pages_per_chunk or app.config["REPORT_PAGES_PER_CHUNK"]
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(file_path)) as work_dir:
+        parts = []
+        pending = []
+        rendered = 0
+
+        chunks = page_chunks(rows, pages_per_chunk)
+        upcoming = next(chunks)
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            while upcoming:
+                first_page, chunk = upcoming
+                # Look one chunk ahead so the last one can print the total
+                upcoming = next(chunks, None)
+                rendered += len(chunk)
+
+                part_path = os.path.join(work_dir, f"part-{len(parts):06d}.pdf")
+                parts.append(part_path)
+
+                pending.append(pool.submit(
+                    render_report_chunk, kind, chunk, part_path, generated_at,
+                    first_page, None if upcoming else rendered
+                ))
+
+                while len(pending) >= processes * 2:
+                    pending.pop(0).result()
+
+            for future in pending:
+                future.result()
+
+        writer = PdfWriter()
+        for part_path in parts:
+            writer.append(part_path)
+
+        with open(file_path, "wb") as out:
+            writer.write(out)
+
+    return file_path
+
+
+def generate_report_pdf(kind, file_path, processes=None):
+    """
+    Render a report from the database. Large row sets are split across
+    REPORT_PROCESSES worker processes; small ones stay single-process.
+    """
+    processes = processes or app.config["REPORT_PROCESSES"]
+    statement = REPORT_TABLES[kind]["rows"]()
+
+    if processes > 1:
+        total = db.session.execute(
+            db.select(db.func.count()).select_from(statement.subquery())
+        ).scalar()
+
+        if total >= app.config["REPORT_PARALLEL_MIN_ROWS"]:
+            return render_report_parallel(
+                kind, stream_rows(statement), file_path, processes
+            )
+
+    return render_report(kind, stream_rows(statement), file_path)
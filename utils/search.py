@@ -0,0 +1,183 @@
+"""
+Full-text search over projects and students (SQLite FTS5).
+
+Two standalone FTS5 tables hold a copy of the searchable columns:
+
+    project_fts  rowid = project.id   title, description, feedback,
+                                      student_name, student_email, programme
+    student_fts  rowid = user.id      name, email, programme
+
+The write routes keep them current by calling index_projects(),
+index_students() and remove_projects() inside the same transaction as
+the change. Every function takes anything with .execute(), so it works
+with a Session (routes) or a Connection (migrations).
+
+On databases without FTS5 (anything but SQLite) search falls back to
+LIKE matching and the index functions do nothing.
+"""
+
+import re
+
+from sqlalchemy import text
+
+
+PROJECT_COLUMNS = ("title", "description", "feedback", "student_name", "student_email", "programme")
+STUDENT_COLUMNS = ("name", "email", "programme")
+
+# bm25 weights, in column order: a title hit counts most
+PROJECT_WEIGHTS = "10.0, 2.0, 1.0, 5.0, 5.0, 3.0"
+STUDENT_WEIGHTS = "10.0, 5.0, 3.0"
+
+
+def fts_enabled(conn):
+    bind = conn.get_bind() if hasattr(conn, "get_bind") else conn
+    return bind.dialect.name == "sqlite"
+
+
+def create_search_tables(conn):
+    options = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS project_fts "
+        f"USING fts5({', '.join(PROJECT_COLUMNS)}, {options})"
+    ))
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS student_fts "
+        f"USING fts5({', '.join(STUDENT_COLUMNS)}, {options})"
+    ))
+
+
+def _ids_clause(ids):
+    # ids are ints from the ORM, never user input
+    return ", ".join(str(int(i)) for i in ids)
+
+
+def index_projects(conn, project_ids=None):
+    """(Re)index the given projects, or every project when ids is None."""
+    if not fts_enabled(conn) or project_ids == []:
+        return
+
+    where = ""
+    if project_ids is not None:
+        where = f"WHERE p.id IN ({_ids_clause(project_ids)})"
+
+    remove_projects(conn, project_ids)
+    conn.execute(text(f"""
+        INSERT INTO project_fts (rowid, {', '.join(PROJECT_COLUMNS)})
+        SELECT p.id, p.title, p.description, p.feedback, u.name, u.email, u.programme
+        FROM project p LEFT JOIN user u ON u.id = p.student_id
+        {where}
+    """))
+
+
+def remove_projects(conn, project_ids=None):
+    if not fts_enabled(conn):
+        return
+
+    if project_ids is None:
+        conn.execute(text("DELETE FROM project_fts"))
+    elif project_ids:
+        conn.execute(text(f"DELETE FROM project_fts WHERE rowid IN ({_ids_clause(project_ids)})"))
+
+
+def index_students(conn, user_ids=None):
+    """(Re)index the given students, or every student when ids is None."""
+    if not fts_enabled(conn):
+        return
+
+    if user_ids is None:
+        conn.execute(text("DELETE FROM student_fts"))
+        where = ""
+    elif not user_ids:
+        return
+    else:
+        ids = _ids_clause(user_ids)
+        conn.execute(text(f"DELETE FROM student_fts WHERE rowid IN ({ids})"))
+        where = f"AND id IN ({ids})"
+
+    conn.execute(text(f"""
+        INSERT INTO student_fts (rowid, {', '.join(STUDENT_COLUMNS)})
+        SELECT id, name, email, programme FROM user
+        WHERE role = 'student' {where}
+    """))
+
+
+def rebuild(conn):
+    create_search_tables(conn)
+    index_projects(conn)
+    index_students(conn)
+
+
+def match_expression(query):
+    """
+    Turn free text into a safe FTS5 MATCH string: every word must
+    appear, each as a prefix ("ama boat" -> "ama"* "boat"*).
+    """
+    words = re.findall(r"\w+", query, re.UNICODE)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_projects(conn, query, limit=20, offset=0):
+    """
+    Ranked project ids (best first) for `query`, over every match;
+    ties go to the newest so pages are stable. Returns (ids, has_more).
+    """
+    expression = match_expression(query)
+    if not expression:
+        return [], False
+
+    if fts_enabled(conn):
+        rows = conn.execute(text(f"""
+            SELECT rowid FROM project_fts
+            WHERE project_fts MATCH :q
+            ORDER BY bm25(project_fts, {PROJECT_WEIGHTS}), rowid DESC
+            LIMIT :limit OFFSET :offset
+        """), {"q": expression, "limit": limit + 1, "offset": offset})
+    else:
+        rows = conn.execute(text(f"""
+            SELECT p.id FROM project p LEFT JOIN "user" u ON u.id = p.student_id
+            WHERE {_like_all(query, ("p.title", "p.description", "p.feedback", "u.name", "u.email", "u.programme"))}
+            ORDER BY p.created_at DESC
+            LIMIT :limit OFFSET :offset
+        """), {**_like_params(query), "limit": limit + 1, "offset": offset})
+
+    ids = [row[0] for row in rows]
+    return ids[:limit], len(ids) > limit
+
+
+def search_students(conn, query, limit=20, offset=0):
+    """Ranked student ids (best first). Returns (ids, has_more)."""
+    expression = match_expression(query)
+    if not expression:
+        return [], False
+
+    if fts_enabled(conn):
+        rows = conn.execute(text(f"""
+            SELECT rowid FROM student_fts
+            WHERE student_fts MATCH :q
+            ORDER BY bm25(student_fts, {STUDENT_WEIGHTS}), rowid DESC
+            LIMIT :limit OFFSET :offset
+        """), {"q": expression, "limit": limit + 1, "offset": offset})
+    else:
+        rows = conn.execute(text(f"""
+            SELECT id FROM "user"
+            WHERE role = 'student' AND {_like_all(query, ("name", "email", "programme"))}
+            ORDER BY name
+            LIMIT :limit OFFSET :offset
+        """), {**_like_params(query), "limit": limit + 1, "offset": offset})
+
+    ids = [row[0] for row in rows]
+    return ids[:limit], len(ids) > limit
+
+
+def _like_all(query, columns):
+    words = re.findall(r"\w+", query, re.UNICODE)
+    return " AND ".join(
+        "(" + " OR ".join(f"LOWER({column}) LIKE :w{i}" for column in columns) + ")"
+        for i in range(len(words))
+    )
+
+
+def _like_params(query):
+    words = re.findall(r"\w+", query, re.UNICODE)
+    return {f"w{i}": f"%{word.lower()}%" for i, word in enumerate(words)}
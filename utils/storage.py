@@ -0,0 +1,183 @@
+import hashlib
+import os
+import tempfile
+import time
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def stream_to_disk(stream, dest_dir, max_size, chunk_size=CHUNK_SIZE):
+    """
+    Copy a file-like upload to a temp file in `dest_dir` chunk by chunk,
+    hashing as the bytes arrive.
+
+    Stops as soon as more than `max_size` bytes have been read, so an
+    oversized upload never lands on disk in full.
+    Returns (temp_path, sha256_hex, size). The caller moves temp_path.
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, temp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-")
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadTooLarge(f"Upload exceeds {max_size} bytes")
+
+                digest.update(chunk)
+                out.write(chunk)
+
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    return temp_path, digest.hexdigest(), size
+
+
+class HashingUpload:
+    """
+    A file for the multipart parser to write an upload part into.
+
+    The bytes go to a temp file in `dest_dir` and are hashed as they
+    arrive, so save_blob() only has to rename the file. Past `max_size`
+    bytes it keeps counting but stops writing. Closing it (Werkzeug does
+    at the end of the request) removes the file unless take() handed it
+    over.
+    """
+
+    def __init__(self, dest_dir, max_size=None):
+        fd, self.path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-")
+        self.file = os.fdopen(fd, "w+b")
+        self.dest_dir = dest_dir
+        self.max_size = max_size
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is None or self.size <= self.max_size:
+            self.digest.update(data)
+            self.file.write(data)
+        return len(data)
+
+    def too_large(self):
+        return self.max_size is not None and self.size > self.max_size
+
+    def take(self):
+        """
+        Flush to disk and give up the file.
+        Returns (temp_path, sha256_hex, size). The caller moves temp_path.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        temp_path, self.path = self.path, None
+        return temp_path, self.digest.hexdigest(), self.size
+
+    def close(self):
+        self.file.close()
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+    def __getattr__(self, name):
+        # read(), seek(), tell()... for code that reads the upload back
+        return getattr(self.file, name)
+
+
+# ==================================================
+# CONTENT-ADDRESSED STORE
+# ==================================================
+# Blobs live at <root>/<aa>/<bb>/<sha256><ext>: identical uploads share
+# one file and the two shard levels keep every directory small.
+
+# A blob re-uploaded this recently is never collected, so a commit that
+# is about to reference it can't lose the file to a concurrent delete.
+GC_GRACE_SECONDS = 60
+
+
+def blob_name(sha256, ext=""):
+    return "/".join((sha256[:2], sha256[2:4], sha256 + ext.lower()))
+
+
+def save_blob(file, root, max_size=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream a Werkzeug FileStorage into the content-addressed store.
+    Returns (name, sha256_hex, size) where `name` is relative to `root`.
+
+    A HashingUpload already in `root` is taken as it is: it was hashed
+    while the request was parsed, so storing it is a rename.
+    """
+    stream = file.stream
+    if isinstance(stream, HashingUpload) and stream.path and stream.dest_dir == root:
+        if stream.too_large() or (max_size is not None and stream.size > max_size):
+            raise UploadTooLarge(f"Upload exceeds {max_size or stream.max_size} bytes")
+        temp_path, sha256, size = stream.take()
+    else:
+        temp_path, sha256, size = stream_to_disk(stream, root, max_size, chunk_size)
+
+    ext = os.path.splitext(file.filename or "")[1]
+    if not ext[1:].isalnum():
+        ext = ""
+    name = blob_name(sha256, ext)
+    path = os.path.join(root, name)
+
+    if os.path.exists(path):
+        # Already stored: drop the copy, refresh the GC grace window
+        os.unlink(temp_path)
+        os.utime(path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+
+    return name, sha256, size
+
+
+def delete_blob(root, name, grace=GC_GRACE_SECONDS):
+    """
+    Remove an unreferenced file and any shard directories it leaves empty.
+    Returns True if the file was deleted.
+    """
+    path = os.path.join(root, name)
+
+    try:
+        if time.time() - os.path.getmtime(path) < grace:
+            return False
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+
+    directory = os.path.dirname(path)
+    while os.path.abspath(directory) != os.path.abspath(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+    return True
+
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,171 @@
+from app import db, User, Project
+from utils import search
+from werkzeug.security import generate_password_hash
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import csv
+import os
+import re
+import time
+
+
+COLUMNS = ("name", "email", "password", "level", "programme", "department", "session_type")
+REQUIRED = ("name", "email", "password")
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Profile fields refreshed when the email already exists.
+# Passwords of existing accounts are never overwritten by an import.
+UPDATED_ON_CONFLICT = ("name", "level", "programme", "department", "session_type")
+
+
+def validate_row(row, seen_emails):
+    """Return (clean_row, None) or (None, error message)."""
+    clean = {column: (row.get(column) or "").strip() for column in COLUMNS}
+
+    for column in REQUIRED:
+        if not clean[column]:
+            return None, f"missing {column}"
+
+    if not EMAIL_PATTERN.match(clean["email"]):
+        return None, "invalid email"
+
+    # Stored as given (login matches exactly), compared case-insensitively
+    if clean["email"].lower() in seen_emails:
+        return None, "duplicate email in file"
+
+    seen_emails.add(clean["email"].lower())
+
+    for column in COLUMNS:
+        clean[column] = clean[column] or None
+
+    return clean, None
+
+
+def upsert_statement():
+    """INSERT ... ON CONFLICT (email) DO UPDATE for the active dialect."""
+    dialect = db.engine.dialect.name
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise RuntimeError(f"Student import needs SQLite or PostgreSQL, not {dialect}")
+
+    statement = insert(User.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=[User.__table__.c.email],
+        set_={
+            **{column: statement.excluded[column] for column in UPDATED_ON_CONFLICT},
+            "updated_at": statement.excluded["updated_at"],
+        },
+        # Never turn an admin account into a student
+        where=User.__table__.c.role == "student"
+    )
+
+
+def write_batch(batch, hashes):
+    """
+    Upsert one batch in its own transaction and index it for search.
+    `batch` is [(line_number, row)]. Returns the (line_number, email) of
+    rows skipped because the email belongs to a non-student account.
+    """
+    emails = [row["email"] for _, row in batch]
+    taken = {
+        email for (email,) in
+        db.session.query(User.email).filter(User.email.in_(emails), User.role != "student")
+    }
+
+    now = datetime.utcnow()
+    rows = [
+        {**row, "password": password_hash, "role": "student", "updated_at": now}
+        for (_, row), password_hash in zip(batch, hashes)
+        if row["email"] not in taken
+    ]
+
+    if rows:
+        db.session.execute(upsert_statement(), rows)
+
+        ids = [
+            user_id for (user_id,) in
+            db.session.query(User.id).filter(
+                User.email.in_([row["email"] for row in rows]), User.role == "student"
+            )
+        ]
+        search.index_students(db.session, ids)
+
+        # project_fts copies the student's name, email and programme
+        project_ids = [
+            project_id for (project_id,) in
+            db.session.query(Project.id).filter(Project.student_id.in_(ids))
+        ]
+        search.index_projects(db.session, project_ids)
+
+    db.session.commit()
+
+    return [(line_number, row["email"]) for line_number, row in batch if row["email"] in taken]
+
+
+def import_students(lines, batch_size=500, processes=None, on_error=None):
+    """
+    Stream CSV `lines` (any iterable of text lines with a header row)
+    into the user table.
+
+    Valid rows are collected into batches; each batch's passwords are
+    hashed across a process pool (hashing is deliberately slow and
+    CPU-bound) and written with one executemany upsert on email.
+    on_error(line_number, email, message) is called for every bad row.
+    Returns a summary dict including throughput.
+    """
+    started = time.perf_counter()
+    processes = processes or os.cpu_count() or 1
+
+    reader = csv.DictReader(lines)
+    missing = [column for column in REQUIRED if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+
+    seen_emails = set()
+    summary = {"rows": 0, "imported": 0, "errors": 0}
+    batch = []
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+
+        def flush():
+            chunksize = max(1, len(batch) // (processes * 4))
+            hashes = list(pool.map(
+                generate_password_hash,
+                [row["password"] for _, row in batch],
+                chunksize=chunksize
+            ))
+            skipped = write_batch(batch, hashes)
+
+            summary["imported"] += len(batch) - len(skipped)
+            summary["errors"] += len(skipped)
+            if on_error:
+                for line_number, email in skipped:
+                    on_error(line_number, email, "email belongs to a non-student account")
+            batch.clear()
+
+        # Header is line 1
+        for line_number, row in enumerate(reader, start=2):
+            summary["rows"] += 1
+
+            clean, error = validate_row(row, seen_emails)
+            if error:
+                summary["errors"] += 1
+                if on_error:
+                    on_error(line_number, (row.get("email") or "").strip(), error)
+                continue
+
+            batch.append((line_number, clean))
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    summary["rows_per_second"] = round(summary["rows"] / summary["seconds"], 1) if summary["seconds"] else None
+    return summary